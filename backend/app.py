@@ -1,28 +1,41 @@
 import os
-import re
-import json
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File
+import hashlib
+from datetime import datetime
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, UploadFile, File, Request, Response, Query, Header
 from fastapi.middleware.cors import CORSMiddleware
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 from pydantic import BaseModel
-from werkzeug.utils import secure_filename
 from fastapi.staticfiles import StaticFiles
-from starlette.responses import FileResponse
-from docx import Document
-import PyPDF2
+from starlette.responses import FileResponse, StreamingResponse, PlainTextResponse
 
 # Absolute imports from your package
-from database.db import Base, engine, SessionLocal
-from database import crud, models
+from database.db import engine, async_engine, SessionLocal, AsyncSessionLocal
+from database import crud, async_crud, models, migrate
+from database.scoreboard import boards
+from events import events, event_scope, writable_event
+from live import ScoreboardBroadcaster
+from etags import versions, etag_for
+from jobs import jobs, start_import
+from rounds import round_cache
+from idempotency import replays
+from metrics import metrics, MetricsMiddleware
+from responses import FastJSONResponse, fast_json, csv_lines, ndjson_lines
+from compression import CompressionMiddleware
 
 # =====================
 # App setup
 # =====================
 UPLOAD_FOLDER = "uploads"
 ALLOWED_EXTENSIONS = {"txt", "docx", "pdf"}
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Apply pending schema migrations on import; otherwise run `python -m database.migrate` on deploy
+AUTO_MIGRATE = os.getenv("AUTO_MIGRATE", "false").lower() in ("1", "true", "yes")
 
-app = FastAPI(title="Church Quiz API", version="1.3")
+app = FastAPI(title="Church Quiz API", version="1.3", default_response_class=FastJSONResponse)
+api = APIRouter()
 
 # CORS
 app.add_middleware(
@@ -31,12 +44,22 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor"],
 )
 
+# brotli/gzip for large responses (inside metrics, so sizes are bytes on the wire)
+app.add_middleware(CompressionMiddleware)
+
+# Request and SQL instrumentation, served at /metrics
+app.add_middleware(MetricsMiddleware)
+metrics.instrument(engine, crud, async_crud)
+metrics.instrument(async_engine.sync_engine, crud, async_crud)
+
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 
-# Create DB tables (safe on startup)
-Base.metadata.create_all(bind=engine)
+# Schema management stays out of the cold-start path unless asked for
+if AUTO_MIGRATE:
+    migrate.upgrade()
 
 # Dependency
 def get_db():
@@ -46,9 +69,48 @@ def get_db():
     finally:
         db.close()
 
+# Async dependency: the route waits on the database without holding a threadpool slot
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def scoreboard_snapshot(event_id):
+    async def snapshot():
+        async with AsyncSessionLocal() as db:
+            return (await async_crud.get_live_scoreboard(db, event_id)).full()
+    return snapshot
+
+# Live scoreboard push: a board change wakes only the SSE streams of its event
+broadcasters = {}
+
+def broadcaster_for(event_id):
+    if event_id not in broadcasters:
+        broadcasters[event_id] = ScoreboardBroadcaster(scoreboard_snapshot(event_id))
+    return broadcasters[event_id]
+
+def publish_scoreboard(event_id):
+    broadcaster = broadcasters.get(event_id)
+    if broadcaster is not None:
+        broadcaster.publish()
+
+boards.add_listener(publish_scoreboard)
+
 # =====================
 # Pydantic Schemas
 # =====================
+class EventCreate(BaseModel):
+    name: str
+
+class EventOut(BaseModel):
+    id: int
+    name: str
+    status: str
+    created_at: Optional[datetime]
+    archived_at: Optional[datetime]
+
+    class Config:
+        orm_mode = True
+
 class TeamCreate(BaseModel):
     name: str
     color: Optional[str] = None
@@ -95,33 +157,92 @@ class ScoreOut(BaseModel):
     class Config:
         orm_mode = True
 
+def score_out(score: models.Score):
+    return {"id": score.id, "team_id": score.team_id, "question_id": score.question_id,
+            "points_awarded": score.points_awarded}
+
+# =====================
+# EVENT ROUTES
+# =====================
+@app.get("/events", response_model=List[EventOut])
+def get_events(db: Session = Depends(get_db)):
+    return crud.get_events(db)
+
+@app.post("/events", response_model=EventOut)
+def create_event(event: EventCreate, db: Session = Depends(get_db)):
+    try:
+        return crud.create_event(db, event.name)
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="An event with this name already exists")
+
+@app.get("/events/{event_id}", response_model=EventOut)
+def get_event(event_id: int, db: Session = Depends(get_db)):
+    event = crud.get_event(db, event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return event
+
+@app.post("/events/{event_id}/archive", response_model=EventOut)
+def archive_event(event_id: int, db: Session = Depends(get_db)):
+    """Makes the event read-only; its data stays readable under /events/{event_id}/..."""
+    event = crud.archive_event(db, event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    events.forget(event_id)
+    return event
+
+@app.post("/events/{event_id:int}/reset")
+def reset_event(event_id: int = Depends(writable_event), keep_teams: bool = False, keep_questions: bool = False,
+                db: Session = Depends(get_db)):
+    """Deletes the event's scores, and its teams and questions unless kept. Other events are untouched."""
+    deleted = crud.reset_event(db, event_id, keep_teams=keep_teams, keep_questions=keep_questions)
+    versions.bump(event_id, "teams", "questions", "scores")
+    return {"event_id": event_id, "deleted": deleted}
+
+@app.delete("/events/{event_id}")
+def delete_event(event_id: int, db: Session = Depends(get_db)):
+    if event_id == models.DEFAULT_EVENT_ID:
+        raise HTTPException(status_code=400, detail="The default event cannot be deleted; reset it instead")
+    deleted = crud.delete_event(db, event_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Event not found")
+    events.forget(event_id)
+    broadcasters.pop(event_id, None)
+    versions.bump(event_id, "teams", "questions", "scores")
+    return {"message": f"Event {deleted.name} deleted"}
+
 # =====================
 # TEAM ROUTES
 # =====================
-@app.post("/teams", response_model=TeamOut)
-def create_team(team: TeamCreate, db: Session = Depends(get_db)):
-    return crud.create_team(
+@api.post("/teams", response_model=TeamOut)
+def create_team(team: TeamCreate, event_id: int = Depends(writable_event), db: Session = Depends(get_db)):
+    created = crud.create_team(
         db,
+        event_id,
         name=team.name,
         color=team.color or "#6A0DAD",
         timer_seconds=team.timer_seconds
     )
+    versions.bump(event_id, "teams")
+    return created
 
-@app.get("/teams", response_model=List[TeamOut])
-def get_teams(db: Session = Depends(get_db)):
-    return crud.get_teams(db)
+@api.get("/teams", response_model=List[TeamOut], dependencies=[etag_for("teams")])
+async def get_teams(response: Response, event_id: int = Depends(event_scope), db: AsyncSession = Depends(get_async_db)):
+    return fast_json(await async_crud.get_team_rows(db, event_id), response)
 
-@app.get("/teams/{team_id}", response_model=TeamOut)
-def get_team(team_id: int, db: Session = Depends(get_db)):
-    team = crud.get_team(db, team_id)
+@api.get("/teams/{team_id}", response_model=TeamOut, dependencies=[etag_for("teams")])
+async def get_team(team_id: int, event_id: int = Depends(event_scope), db: AsyncSession = Depends(get_async_db)):
+    team = await async_crud.get_team(db, event_id, team_id)
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     return team
 
-@app.put("/teams/{team_id}", response_model=TeamOut)
-def update_team(team_id: int, team: TeamCreate, db: Session = Depends(get_db)):
+@api.put("/teams/{team_id}", response_model=TeamOut)
+def update_team(team_id: int, team: TeamCreate, event_id: int = Depends(writable_event), db: Session = Depends(get_db)):
     updated = crud.update_team(
         db,
+        event_id,
         team_id,
         new_name=team.name,
         new_color=team.color,
@@ -129,149 +250,310 @@ def update_team(team_id: int, team: TeamCreate, db: Session = Depends(get_db)):
     )
     if not updated:
         raise HTTPException(status_code=404, detail="Team not found")
+    versions.bump(event_id, "teams")
     return updated
 
-@app.delete("/teams/{team_id}")
-def delete_team(team_id: int, db: Session = Depends(get_db)):
-    deleted = crud.delete_team(db, team_id)
+@api.delete("/teams/{team_id}")
+def delete_team(team_id: int, event_id: int = Depends(writable_event), db: Session = Depends(get_db)):
+    deleted = crud.delete_team(db, event_id, team_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Team not found")
+    versions.bump(event_id, "teams", "scores")
     return {"message": f"Team {deleted.name} deleted"}
 
 # =====================
 # QUESTION ROUTES
 # =====================
-@app.post("/questions", response_model=QuestionOut)
-def create_question(question: QuestionCreate, db: Session = Depends(get_db)):
-    return crud.create_question(db,
-                                text=question.text,
-                                answer=question.answer,
-                                category=question.category,
-                                points=question.points,
-                                options=question.options)
-
-@app.get("/questions", response_model=List[QuestionOut])
-def get_questions(db: Session = Depends(get_db)):
-    return crud.get_questions(db)
-
-@app.get("/categories")
-def get_categories(db: Session = Depends(get_db)):
-    categories = crud.get_categories_from_questions(db)
-    return [{"id": i + 1, "name": str(c)} for i, c in enumerate(categories)]
-
-@app.get("/categories/{category_id}/questions", response_model=List[QuestionOut])
-def get_questions_by_category(category_id: int, db: Session = Depends(get_db)):
-    categories = crud.get_categories_from_questions(db)
-    if category_id < 1 or category_id > len(categories):
+@api.post("/questions", response_model=QuestionOut)
+def create_question(question: QuestionCreate, event_id: int = Depends(writable_event), db: Session = Depends(get_db)):
+    created = crud.create_question(db,
+                                   event_id,
+                                   text=question.text,
+                                   answer=question.answer,
+                                   category=question.category,
+                                   points=question.points,
+                                   options=question.options)
+    versions.bump(event_id, "questions")
+    return created
+
+def question_fields(fields: Optional[str] = None, view: Optional[str] = None):
+    """
+    Query params shared by the question list routes:
+    ``fields=id,text,...`` picks columns, ``view=presenter`` drops the answer.
+    """
+    if fields:
+        chosen = tuple(f.strip() for f in fields.split(",") if f.strip())
+        unknown = [f for f in chosen if f not in crud.QUESTION_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+        if view == "presenter" and "answer" in chosen:
+            raise HTTPException(status_code=400, detail="The presenter view has no answer field")
+        return chosen
+    if view == "presenter":
+        return crud.PRESENTER_FIELDS
+    if view:
+        raise HTTPException(status_code=400, detail="Unknown view")
+    return crud.QUESTION_FIELDS
+
+def question_page(response: Response, rows, next_cursor):
+    # body stays a plain list; the cursor for the next page travels in a header
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return fast_json(rows, response)
+
+@api.get("/questions", dependencies=[etag_for("questions")])
+def get_questions(response: Response,
+                  limit: Optional[int] = Query(None, ge=1, le=500),
+                  after: Optional[int] = None,
+                  fields: tuple = Depends(question_fields),
+                  event_id: int = Depends(event_scope),
+                  db: Session = Depends(get_db)):
+    """Questions ordered by id. With ``limit``, pages continue from ``after`` (see X-Next-Cursor)."""
+    rows, next_cursor = crud.get_question_page(db, event_id, after=after, limit=limit, fields=fields)
+    return question_page(response, rows, next_cursor)
+
+# declared before /questions/{question_id} so "search" is not taken for an id
+@api.get("/questions/search", dependencies=[etag_for("questions")])
+def search_questions(response: Response,
+                     q: str = Query(..., min_length=1, max_length=200),
+                     category: Optional[str] = None,
+                     limit: int = Query(20, ge=1, le=100),
+                     offset: int = Query(0, ge=0),
+                     fields: tuple = Depends(question_fields),
+                     event_id: int = Depends(event_scope),
+                     db: Session = Depends(get_db)):
+    """Ranked full-text search; the last word also matches as a prefix. Next page: ``offset`` from X-Next-Cursor."""
+    rows, next_offset = crud.search_questions(db, event_id, q, category=category, offset=offset, limit=limit,
+                                              fields=fields)
+    return question_page(response, rows, next_offset)
+
+@api.get("/questions/{question_id}", dependencies=[etag_for("questions")])
+def get_question(question_id: int, fields: tuple = Depends(question_fields), event_id: int = Depends(event_scope),
+                 db: Session = Depends(get_db)):
+    """One question with ``prev_id``/``next_id`` of its neighbours in the same category."""
+    question = crud.get_question_with_neighbours(db, event_id, question_id, fields=fields)
+    if not question:
+        raise HTTPException(status_code=404, detail="Question not found")
+    return question
+
+@api.get("/categories", dependencies=[etag_for("questions")])
+def get_categories(response: Response, event_id: int = Depends(event_scope), db: Session = Depends(get_db)):
+    return fast_json([{"id": c.id, "name": c.name} for c in crud.get_categories(db, event_id)], response)
+
+@api.get("/categories/{category_id}/questions", dependencies=[etag_for("questions")])
+def get_questions_by_category(category_id: int, response: Response,
+                              limit: Optional[int] = Query(None, ge=1, le=500),
+                              after: Optional[int] = None,
+                              fields: tuple = Depends(question_fields),
+                              event_id: int = Depends(event_scope),
+                              db: Session = Depends(get_db)):
+    if not crud.get_category(db, event_id, category_id):
         raise HTTPException(status_code=404, detail="Category not found")
+    rows, next_cursor = crud.get_question_page(db, event_id, category_id=category_id, after=after, limit=limit,
+                                               fields=fields)
+    return question_page(response, rows, next_cursor)
 
-    category_name = categories[category_id - 1]
-    return crud.get_questions_by_category(db, category_name)
+# =====================
+# QUIZ ROUNDS
+# =====================
+@api.get("/rounds/bundle", dependencies=[etag_for("teams", "questions")])
+def round_bundle(team_id: int, category_id: int, start_question_id: Optional[int] = None,
+                 event_id: int = Depends(event_scope), db: Session = Depends(get_db)):
+    """
+    Everything QuizPage needs to start a question in one response: the team,
+    the category's ordered question ids, and the current and next questions.
+    """
+    team = crud.get_team(db, event_id, team_id)
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    round_ = round_cache.get(db, event_id, category_id, versions.version(event_id, "questions"))
+    if round_ is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+
+    ids = round_.question_ids
+    index = round_.positions.get(start_question_id, 0)
+    return {
+        "team": {"id": team.id, "name": team.name, "color": team.color, "timer_seconds": team.timer_seconds},
+        "category_id": category_id,
+        "question_ids": ids,
+        "index": index,
+        "current": round_.questions[ids[index]] if ids else None,
+        "next": round_.questions[ids[index + 1]] if index + 1 < len(ids) else None,
+    }
 
 # =====================
 # UPLOAD QUESTIONS (FIXED)
 # =====================
-@app.post("/questions/upload")
-def upload_questions(file: UploadFile = File(...), db: Session = Depends(get_db)):
+@api.post("/questions/upload", status_code=202)
+def upload_questions(file: UploadFile = File(...), event_id: int = Depends(writable_event)):
+    """
+    Saves the file and queues it for parsing and import.
+    Returns the job; poll /jobs/{id} for progress and the result.
+    """
+    from werkzeug.utils import secure_filename  # only needed once someone uploads
     filename = secure_filename(file.filename)
-    ext = filename.rsplit(".", 1)[1].lower()
+    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
     if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Invalid file type")
 
-    filepath = os.path.join(UPLOAD_FOLDER, filename)
-    with open(filepath, "wb") as f:
-        f.write(file.file.read())
-
-    # Read file content
-    text = ""
-    if ext == "txt":
-        with open(filepath, "r", encoding="utf-8") as f:
-            text = f.read()
-    elif ext == "docx":
-        doc = Document(filepath)
-        text = "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
-    elif ext == "pdf":
-        pdf_reader = PyPDF2.PdfReader(filepath)
-        for page in pdf_reader.pages:
-            extracted = page.extract_text()
-            if extracted:
-                text += extracted + "\n"
-
-    created = []
-    for line in text.splitlines():
-        line = line.strip()
-        if not line or "|" not in line:
-            continue
-
-        # 🔹 Remove numbering like "1." or "12."
-        line = re.sub(r'^\d+\.\s*', '', line)
-
-        parts = [p.strip() for p in line.split("|")]
-
-        # Expect format: Question | Answer | Category | Points
-        q_text = parts[0] if len(parts) > 0 else ""
-        q_answer = parts[1] if len(parts) > 1 else ""
-        q_category = parts[2] if len(parts) > 2 else None
-
-        try:
-            q_points = int(parts[3]) if len(parts) > 3 else 10
-        except ValueError:
-            q_points = 10
-
-        # Optional options field
-        q_options = None
-        if len(parts) > 4 and parts[4].strip():
-            try:
-                q_options = json.loads(parts[4]) if (parts[4].strip().startswith("[") and parts[4].strip().endswith("]")) else [o.strip() for o in parts[4].split(",")]
-            except Exception:
-                q_options = [o.strip() for o in parts[4].split(",")]
-
-        # Debug print (can remove later)
-        print(f"Uploading -> Q: {q_text} | A: {q_answer} | C: {q_category} | P: {q_points}")
-
-        question = crud.create_question(
-            db,
-            text=q_text,
-            answer=q_answer,
-            category=q_category,
-            points=q_points,
-            options=q_options,
-        )
-        created.append(question)
-
-    return {"uploaded": len(created), "questions": created}
+    job = jobs.create(filename, event_id)
+
+    # Hash while streaming to disk; identical files share one copy and one parse
+    digest = hashlib.sha256()
+    partial = os.path.join(UPLOAD_FOLDER, f"{job['id']}.part")
+    try:
+        with open(partial, "wb") as f:
+            while chunk := file.file.read(UPLOAD_CHUNK_SIZE):
+                digest.update(chunk)
+                f.write(chunk)
+        sha256 = digest.hexdigest()
+        filepath = os.path.join(UPLOAD_FOLDER, f"{sha256}.{ext}")
+        os.replace(partial, filepath)
+    except Exception as e:
+        # a failed read or write (client gone, disk full) must not leave a queued job or a partial file
+        if os.path.exists(partial):
+            os.remove(partial)
+        jobs.fail(job["id"], f"Upload could not be saved: {e}")
+        raise HTTPException(status_code=500, detail="Upload could not be saved")
+
+    jobs.update(job["id"], sha256=sha256)
+    start_import(job["id"], event_id, filepath, ext, sha256)
+    return jobs.get(job["id"])
+
+@api.get("/jobs/{job_id}")
+def get_job(job_id: str, event_id: int = Depends(event_scope)):
+    job = jobs.get(job_id)
+    if not job or job["event_id"] != event_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
 # =====================
 # CLEAR ALL QUESTIONS
 # =====================
-@app.delete("/questions/clear")
-def clear_all_questions(db: Session = Depends(get_db)):
+@api.delete("/questions/clear")
+def clear_all_questions(event_id: int = Depends(writable_event), db: Session = Depends(get_db)):
     """
-    Deletes all questions from the database.
+    Deletes all of the event's questions, with their categories and scores.
     Use carefully!
     """
-    deleted_count = crud.clear_all_questions(db)
+    deleted_count = crud.clear_questions(db, event_id)
+    versions.bump(event_id, "questions", "scores")
     return {"message": f"{deleted_count} questions deleted successfully."}
 
 # =====================
 # SCORE ROUTES
 # =====================
-@app.post("/scores", response_model=ScoreOut)
-def award_score(score: ScoreCreate, db: Session = Depends(get_db)):
-    return crud.award_points(db, team_id=score.team_id, question_id=score.question_id, points=score.points)
+@api.post("/scores", response_model=ScoreOut)
+async def award_score(score: ScoreCreate, event_id: int = Depends(writable_event), db: AsyncSession = Depends(get_async_db),
+                      idempotency_key: Optional[str] = Header(None)):
+    """
+    Sets the points for a team on a question; awarding the same question again
+    replaces them. Repeats with the same Idempotency-Key replay the first response.
+    """
+    async def award():
+        awarded = await async_crud.award_points(db, event_id, team_id=score.team_id, question_id=score.question_id,
+                                                points=score.points)
+        if awarded is None:
+            raise HTTPException(status_code=404, detail="Team or question not found")
+        versions.bump(event_id, "scores")
+        return score_out(awarded)
+
+    return await replays.run_once(idempotency_key and f"{event_id}:scores:{idempotency_key}", score.dict(), award)
+
+@api.post("/scores/batch", response_model=List[ScoreOut])
+async def award_scores_batch(scores: List[ScoreCreate], event_id: int = Depends(writable_event), db: AsyncSession = Depends(get_async_db),
+                             idempotency_key: Optional[str] = Header(None)):
+    """Many awards in one transaction (last one wins for a repeated team/question); all or nothing."""
+    async def award():
+        awarded = await async_crud.award_points_batch(db, event_id,
+                                                      [(s.team_id, s.question_id, s.points) for s in scores])
+        if awarded is None:
+            raise HTTPException(status_code=404, detail="Team or question not found")
+        versions.bump(event_id, "scores")
+        return [score_out(s) for s in awarded]
+
+    return await replays.run_once(idempotency_key and f"{event_id}:scores/batch:{idempotency_key}",
+                                  [s.dict() for s in scores], award)
+
+@api.get("/teams/{team_id}/scores", dependencies=[etag_for("scores")])
+async def team_scores(team_id: int, response: Response, event_id: int = Depends(event_scope), db: AsyncSession = Depends(get_async_db)):
+    return fast_json(await async_crud.get_scores_for_team(db, event_id, team_id), response)
+
+@api.get("/scoreboard")
+async def scoreboard(event_id: int = Depends(event_scope), db: AsyncSession = Depends(get_async_db)):
+    """Returns overall scoreboard (all teams always included)."""
+    return fast_json((await async_crud.get_live_scoreboard(db, event_id)).overall())
+
+@api.get("/scoreboard/full")
+async def scoreboard_full(event_id: int = Depends(event_scope), db: AsyncSession = Depends(get_async_db)):
+    """Returns overall and per-category scoreboards in one response (all teams in every category)."""
+    return fast_json((await async_crud.get_live_scoreboard(db, event_id)).full())
+
+@api.get("/scoreboard/timeline", dependencies=[etag_for("teams", "scores")])
+def scoreboard_timeline(response: Response,
+                        bucket: str = Query("minute", pattern=f"^({'|'.join(crud.TIMELINE_BUCKETS)})$"),
+                        event_id: int = Depends(event_scope),
+                        db: Session = Depends(get_db)):
+    """Per team: points scored in each minute/hour/day and the running total, for the progression chart."""
+    return fast_json(crud.get_score_timeline(db, event_id, bucket), response)
+
+@api.get("/scores/export")
+def export_scores(format: str = Query("csv", pattern="^(csv|ndjson)$"), event_id: int = Depends(event_scope)):
+    """
+    Every award in the event, oldest first, as CSV or NDJSON (one JSON object per line).
+    Streamed a batch at a time from a server-side cursor on its own session, so memory
+    stays flat however many scores the event has.
+    """
+    async def chunks():
+        if format == "csv":
+            yield csv_lines(None, async_crud.SCORE_EXPORT_FIELDS)
+        async with AsyncSessionLocal() as db:
+            async for batch in async_crud.iter_score_history(db, event_id):
+                if format == "csv":
+                    yield csv_lines(batch, async_crud.SCORE_EXPORT_FIELDS)
+                else:
+                    yield ndjson_lines(batch)
+
+    return StreamingResponse(
+        chunks(),
+        media_type="text/csv; charset=utf-8" if format == "csv" else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="event-{event_id}-scores.{format}"'},
+    )
 
-@app.get("/teams/{team_id}/scores")
-def team_scores(team_id: int, db: Session = Depends(get_db)):
-    return crud.get_scores_for_team(db, team_id)
+@api.get("/scoreboard/stream")
+async def scoreboard_stream(request: Request, event_id: int = Depends(event_scope)):
+    """
+    Server-Sent Events: a "snapshot" event with the full scoreboard, then
+    "delta" events holding only the changed sections, plus heartbeats.
+    """
+    return StreamingResponse(
+        broadcaster_for(event_id).stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-@app.get("/scoreboard")
-def scoreboard(db: Session = Depends(get_db)):
-    """Returns overall scoreboard (all teams always included)."""
-    return crud.get_scoreboard(db)
+@api.post("/scoreboard/rebuild")
+def scoreboard_rebuild(event_id: int = Depends(event_scope), db: Session = Depends(get_db)):
+    """Reloads the event's in-memory scoreboard from the scores table."""
+    crud.load_scoreboard(db, event_id)
+    return crud.get_live_scoreboard(db, event_id).full()
 
-@app.get("/scoreboard/category/{category}")
-def scoreboard_by_category(category: str, db: Session = Depends(get_db)):
+@api.get("/scoreboard/category/{category}")
+async def scoreboard_by_category(category: str, event_id: int = Depends(event_scope), db: AsyncSession = Depends(get_async_db)):
     """Returns scoreboard for a specific category (all teams always included)."""
-    return crud.get_scoreboard_by_category(db, category)
+    return fast_json((await async_crud.get_live_scoreboard(db, event_id)).by_category(category))
+
+# Every data route serves the default event at the root and any event under /events/{event_id}
+app.include_router(api)
+app.include_router(api, prefix="/events/{event_id:int}")
+
+# =====================
+# Metrics
+# =====================
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Request latency, in-flight, response size and per-crud-function query metrics (Prometheus text format)."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
 
 # =====================
 # Serve frontend if built
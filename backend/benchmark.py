@@ -0,0 +1,363 @@
+"""
+Load and latency benchmark for the quiz API.
+
+Simulates an event night against a throwaway SQLite database, in process
+(httpx + ASGI, no network), or against a running server with --url:
+
+  * SCREENS scoreboard screens polling /scoreboard/full
+  * bursts of /scores and /scores/batch posts
+  * SelectTeam / QuizPage / ReviewPage navigation (teams, categories, round bundles, full bank)
+  * a mid-event /questions/upload of a generated DOCX and PDF, followed until the job finishes
+
+Prints one JSON document: p50/p95/p99 latency, throughput and errors per
+route, database queries per request (in-process only), upload job
+durations and peak RSS, with the upload parse workers (in-process only)
+counted separately.
+
+    python benchmark.py --duration 30 --teams 12 --screens 8 --output bench.json
+"""
+import argparse
+import asyncio
+import contextvars
+import io
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+# Queries issued by the current simulated request (in-process mode only)
+_query_counter = contextvars.ContextVar("bench_query_counter", default=None)
+
+
+# =====================
+# Generated upload files
+# =====================
+def question_lines(count, prefix, categories):
+    return [
+        f"{i}. {prefix} question {i} about verse {i % 150} | Answer {i} | {categories[i % len(categories)]} | {5 + i % 3 * 5}"
+        for i in range(1, count + 1)
+    ]
+
+
+def make_docx(lines):
+    from docx import Document
+    doc = Document()
+    for line in lines:
+        doc.add_paragraph(line)
+    buf = io.BytesIO()
+    doc.save(buf)
+    return buf.getvalue()
+
+
+def make_pdf(lines, lines_per_page=40):
+    """A minimal text PDF (Helvetica, one text object per page) that PyPDF2 can extract."""
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    font_id = 3 + 2 * len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [%s] /Count %d >>" % (" ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages))), len(pages)),
+    ]
+    for i, page in enumerate(pages):
+        escaped = (l.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)") for l in page)
+        content = "BT /F1 9 Tf 11 TL 30 810 Td " + " ".join(f"({l}) Tj T*" for l in escaped) + " ET"
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] "
+                       f"/Resources << /Font << /F1 {font_id} 0 R >> >> /Contents {4 + 2 * i} 0 R >>")
+        objects.append(f"<< /Length {len(content)} >>\nstream\n{content}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out, offsets = b"%PDF-1.4\n", []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1")
+    out += "".join(f"{o:010d} 00000 n \n" for o in offsets).encode("latin-1")
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    return out
+
+
+# =====================
+# Measurement
+# =====================
+def rss_kb(pid="self"):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError):
+        return 0
+
+
+def descendant_pids():
+    """Every live process below this one (the upload parse pool and its helpers)."""
+    children = defaultdict(list)
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children[ppid].append(int(entry))
+    found, pending = [], [os.getpid()]
+    while pending:
+        for pid in children.get(pending.pop(), ()):
+            found.append(pid)
+            pending.append(pid)
+    return found
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.queries = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.bytes = defaultdict(int)
+        self.jobs = []
+        self.peak_rss_kb = 0
+        self.peak_workers_rss_kb = 0
+        self.peak_total_rss_kb = 0
+
+    async def call(self, client, label, method, url, **kwargs):
+        counter = [0]
+        token = _query_counter.set(counter)
+        start = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except Exception:
+            self.errors[label] += 1
+            return None
+        finally:
+            _query_counter.reset(token)
+        self.latencies[label].append(time.perf_counter() - start)
+        self.queries[label].append(counter[0])
+        self.bytes[label] += len(response.content)
+        if response.status_code >= 400:
+            self.errors[label] += 1
+        return response
+
+    def sample_rss(self):
+        own = rss_kb()
+        # DOCX/PDF parsing runs in the jobs process pool; it stays alive, so RUSAGE_CHILDREN never sees it
+        workers = sum(rss_kb(pid) for pid in descendant_pids())
+        self.peak_rss_kb = max(self.peak_rss_kb, own)
+        self.peak_workers_rss_kb = max(self.peak_workers_rss_kb, workers)
+        self.peak_total_rss_kb = max(self.peak_total_rss_kb, own + workers)
+
+    def report(self, duration, in_process):
+        def percentile(values, p):
+            ordered = sorted(values)
+            return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+        routes = {}
+        for label, values in sorted(self.latencies.items()):
+            queries = self.queries[label]
+            routes[label] = {
+                "requests": len(values),
+                "errors": self.errors[label],
+                "throughput_rps": round(len(values) / duration, 2),
+                "p50_ms": round(percentile(values, 50) * 1000, 2),
+                "p95_ms": round(percentile(values, 95) * 1000, 2),
+                "p99_ms": round(percentile(values, 99) * 1000, 2),
+                "mean_bytes": round(self.bytes[label] / len(values)),
+                "db_queries_per_request": round(sum(queries) / len(queries), 2) if in_process else None,
+                "db_queries_max": max(queries) if in_process else None,
+            }
+        self.sample_rss()
+        return {
+            "duration_s": duration,
+            "routes": routes,
+            "upload_jobs": self.jobs,
+            "peak_rss_mb": round(max(self.peak_rss_kb, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) / 1024, 1),
+            "parse_workers_peak_rss_mb": round(self.peak_workers_rss_kb / 1024, 1) if in_process else None,
+            "peak_total_rss_mb": round(self.peak_total_rss_kb / 1024, 1) if in_process else None,
+        }
+
+
+def count_queries(*engines):
+    from sqlalchemy import event
+
+    def before_cursor_execute(*args):
+        counter = _query_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+    for engine in engines:
+        event.listen(engine, "before_cursor_execute", before_cursor_execute)
+
+
+# =====================
+# Simulated clients
+# =====================
+async def scoreboard_screen(client, rec, stop, interval):
+    while time.monotonic() < stop:
+        await rec.call(client, "GET /scoreboard/full", "GET", "/scoreboard/full")
+        await asyncio.sleep(interval)
+
+
+async def scorekeeper(client, rec, stop, teams, questions, burst, pause):
+    while time.monotonic() < stop:
+        awards = [
+            {"team_id": random.choice(teams), "question_id": random.choice(questions), "points": random.choice((5, 10))}
+            for _ in range(burst)
+        ]
+        await asyncio.gather(*(
+            rec.call(client, "POST /scores", "POST", "/scores", json=a,
+                     headers={"Idempotency-Key": f"{time.monotonic_ns()}-{i}"})
+            for i, a in enumerate(awards)
+        ))
+        await rec.call(client, "POST /scores/batch", "POST", "/scores/batch", json=awards)
+        await asyncio.sleep(pause)
+
+
+async def quiz_host(client, rec, stop, teams, categories, questions, pause):
+    while time.monotonic() < stop:
+        await rec.call(client, "GET /teams", "GET", "/teams")
+        await rec.call(client, "GET /categories", "GET", "/categories")
+        category = random.choice(categories)
+        await rec.call(client, "GET /categories/{id}/questions", "GET", f"/categories/{category}/questions")
+        await rec.call(client, "GET /rounds/bundle", "GET", "/rounds/bundle", params={
+            "team_id": random.choice(teams), "category_id": category, "start_question_id": random.choice(questions),
+        })
+        await asyncio.sleep(pause)
+
+
+async def reviewer(client, rec, stop, pause):
+    while time.monotonic() < stop:
+        await rec.call(client, "GET /questions", "GET", "/questions")
+        await asyncio.sleep(pause)
+
+
+async def uploader(client, rec, delay, files):
+    await asyncio.sleep(delay)
+    for name, data in files:
+        started = time.perf_counter()
+        response = await rec.call(client, "POST /questions/upload", "POST", "/questions/upload",
+                                  files={"file": (name, data)})
+        if response is None or response.status_code >= 400:
+            rec.jobs.append({"file": name, "status": "rejected"})
+            continue
+        job = response.json()
+        while job.get("status") not in ("done", "failed"):
+            await asyncio.sleep(0.25)
+            polled = await rec.call(client, "GET /jobs/{id}", "GET", f"/jobs/{job['id']}")
+            if polled is not None and polled.status_code == 200:
+                job = polled.json()
+        rec.jobs.append({
+            "file": name, "bytes": len(data), "status": job["status"], "pages": job.get("pages_total"),
+            "questions": job.get("questions_found"), "seconds": round(time.perf_counter() - started, 3),
+        })
+
+
+async def rss_sampler(rec, stop):
+    while time.monotonic() < stop:
+        rec.sample_rss()
+        await asyncio.sleep(0.5)
+
+
+# =====================
+# Runner
+# =====================
+async def seed(client, args, category_names):
+    teams = []
+    for i in range(args.teams):
+        response = await client.post("/teams", json={"name": f"Team {i + 1}", "timer_seconds": 30})
+        teams.append(response.json()["id"])
+
+    lines = question_lines(args.questions, "Seed", category_names)
+    response = await client.post("/questions/upload", files={"file": ("seed.txt", "\n".join(lines).encode())})
+    job = response.json()
+    while job["status"] not in ("done", "failed"):
+        await asyncio.sleep(0.1)
+        job = (await client.get(f"/jobs/{job['id']}")).json()
+    if job["status"] != "done":
+        raise RuntimeError(f"Seeding questions failed: {job['errors'][:3]}")
+
+    categories = [c["id"] for c in (await client.get("/categories")).json()]
+    return teams, categories, job["ids"]
+
+
+async def run(args, client, in_process):
+    category_names = [f"Category {i + 1}" for i in range(args.categories)]
+    teams, categories, questions = await seed(client, args, category_names)
+
+    upload_lines = question_lines(args.upload_questions, "Uploaded", category_names)
+    files = [("event.docx", make_docx(upload_lines)), ("event.pdf", make_pdf(upload_lines))]
+
+    rec = Recorder()
+    stop = time.monotonic() + args.duration
+    started = time.perf_counter()
+    tasks = [rss_sampler(rec, stop), uploader(client, rec, args.duration / 2, files)]
+    tasks += [scoreboard_screen(client, rec, stop, args.poll_interval) for _ in range(args.screens)]
+    tasks += [scorekeeper(client, rec, stop, teams, questions, args.burst, args.burst_pause)]
+    tasks += [quiz_host(client, rec, stop, teams, categories, questions, 1.0) for _ in range(args.hosts)]
+    tasks += [reviewer(client, rec, stop, 3.0) for _ in range(args.reviewers)]
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    report = rec.report(round(elapsed, 2), in_process)
+    report["config"] = {k: v for k, v in vars(args).items() if k != "output"}
+    return report
+
+
+async def main_async(args):
+    import httpx
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=120) as client:
+            return await run(args, client, in_process=False)
+
+    # Fresh SQLite database and upload folder; must be set before the app is imported
+    workdir = tempfile.mkdtemp(prefix="quiz-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.chdir(workdir)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import app as quiz_app
+    from database import migrate
+    from database.db import engine, async_engine
+    migrate.upgrade()
+    count_queries(engine, async_engine.sync_engine)
+
+    transport = httpx.ASGITransport(app=quiz_app.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        return await run(args, client, in_process=True)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Quiz API load and latency benchmark")
+    parser.add_argument("--url", help="benchmark a running server instead of an in-process app")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of simulated event")
+    parser.add_argument("--teams", type=int, default=8)
+    parser.add_argument("--categories", type=int, default=6)
+    parser.add_argument("--questions", type=int, default=600, help="questions seeded before the run")
+    parser.add_argument("--upload-questions", type=int, default=2000, help="questions in the mid-event DOCX/PDF")
+    parser.add_argument("--screens", type=int, default=8, help="scoreboard screens polling")
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--burst", type=int, default=10, help="score posts per burst")
+    parser.add_argument("--burst-pause", type=float, default=2.0)
+    parser.add_argument("--hosts", type=int, default=2, help="quiz hosts navigating SelectTeam/QuizPage")
+    parser.add_argument("--reviewers", type=int, default=1, help="ReviewPage clients loading the full bank")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    random.seed(args.seed)
+    output = os.path.abspath(args.output) if args.output else None
+    report = asyncio.run(main_async(args))
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import gzip
+import os
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Responses smaller than this go out uncompressed
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def choose_encoding(accept_encoding: str):
+    """Best supported coding the client accepts: br, then gzip, honouring q=0."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    for coding in (("br",) if brotli else ()) + ("gzip",):
+        if accepted.get(coding, accepted.get("*", 0)) > 0:
+            return coding
+    return None
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    if coding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    Negotiated brotli/gzip for complete responses of at least ``minimum_size`` bytes.
+
+    Only responses sent in a single body message are compressed; streamed
+    ones (Server-Sent Events, files) pass through untouched and unbuffered.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        coding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if coding is None:
+            return await self.app(scope, receive, send)
+
+        pending = None
+
+        async def send_wrapper(message):
+            nonlocal pending
+            if message["type"] == "http.response.start":
+                pending = message  # held until the first body message shows whether it streams
+                return
+            if pending is None or message["type"] != "http.response.body":
+                return await send(message)
+
+            start, pending = pending, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            content_type = headers.get("content-type", "")
+            if (message.get("more_body") or "content-encoding" in headers
+                    or content_type.startswith("text/event-stream")
+                    or not content_type.startswith(COMPRESSIBLE_TYPES)):
+                await send(start)
+                return await send(message)
+
+            headers.add_vary_header("Accept-Encoding")
+            if len(body) >= self.minimum_size:
+                body = compress(body, coding)
+                headers["Content-Encoding"] = coding
+                headers["Content-Length"] = str(len(body))
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_wrapper)
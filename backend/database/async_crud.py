@@ -0,0 +1,88 @@
+"""
+Async variants of the crud functions behind the busiest routes.
+
+Simple reads are written against AsyncSession here. Logic that is more
+than one query (score awards with their compare-and-set retries, the
+scoreboard reload) lives once in crud.py and runs through
+AsyncSession.run_sync, still without a threadpool slot.
+"""
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import Event, Team, Question, Score
+from .scoreboard import boards
+from . import crud
+
+# =====================
+# EVENT CRUD
+# =====================
+async def get_event(db: AsyncSession, event_id: int):
+    return await db.get(Event, event_id)
+
+# =====================
+# TEAM CRUD
+# =====================
+async def get_team(db: AsyncSession, event_id: int, team_id: int):
+    team = await db.get(Team, team_id)
+    return team if team is not None and team.event_id == event_id else None
+
+async def get_team_rows(db: AsyncSession, event_id: int):
+    """Teams as plain dicts straight from the columns (no ORM objects) for list responses."""
+    result = await db.execute(
+        select(Team.id, Team.name, Team.color, Team.timer_seconds).where(Team.event_id == event_id)
+    )
+    return [dict(r) for r in result.mappings()]
+
+# =====================
+# SCORE CRUD
+# =====================
+async def award_points_batch(db: AsyncSession, event_id: int, awards):
+    return await db.run_sync(crud.award_points_batch, event_id, awards)
+
+async def award_points(db: AsyncSession, event_id: int, team_id: int, question_id: int, points: int):
+    return await db.run_sync(crud.award_points, event_id, team_id, question_id, points)
+
+async def get_scores_for_team(db: AsyncSession, event_id: int, team_id: int):
+    """A team's scores as plain dicts."""
+    result = await db.execute(
+        select(Score.question_id, Score.team_id, Score.created_at, Score.id, Score.points_awarded)
+        .where(Score.event_id == event_id, Score.team_id == team_id)
+    )
+    return [dict(r) for r in result.mappings()]
+
+# =====================
+# SCORE HISTORY
+# =====================
+SCORE_EXPORT_FIELDS = ("id", "created_at", "team_id", "team_name", "question_id", "category", "question",
+                       "points_awarded")
+
+async def iter_score_history(db: AsyncSession, event_id: int, batch_size: int = 1000):
+    """
+    Every award in the event with its team and question, oldest first, as lists of
+    at most ``batch_size`` dicts. Rows come off a server-side cursor, so memory
+    stays at one batch however long the history is.
+    """
+    result = await db.stream(
+        select(Score.id, Score.created_at, Score.team_id, Team.name.label("team_name"), Score.question_id,
+               Question.category, Question.text.label("question"), Score.points_awarded)
+        .join(Team, Team.id == Score.team_id)
+        .join(Question, Question.id == Score.question_id)
+        .where(Score.event_id == event_id)
+        .order_by(Score.created_at, Score.id)
+        .execution_options(yield_per=batch_size)
+    )
+    async for partition in result.mappings().partitions():
+        yield [dict(row) for row in partition]
+
+# =====================
+# LIVE SCOREBOARD (in-memory)
+# =====================
+async def load_scoreboard(db: AsyncSession, event_id: int):
+    return await db.run_sync(crud.load_scoreboard, event_id)
+
+async def get_live_scoreboard(db: AsyncSession, event_id: int):
+    board = boards.get(event_id)
+    for _ in range(3):  # a load is dropped if scores changed while it ran
+        if board.is_loaded():
+            break
+        await load_scoreboard(db, event_id)
+    return board
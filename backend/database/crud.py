@@ -1,126 +1,544 @@
 from sqlalchemy.orm import Session
-from .models import Team, Question, Score
-from sqlalchemy import func, distinct
+from .models import Event, Team, Category, Question, Score, question_text_hash, DEFAULT_EVENT_ID
+from .scoreboard import boards
+from .search import search_index, ranked_question_ids
+from sqlalchemy import and_, case, func, insert, literal_column, or_, select, tuple_, update
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.exc import IntegrityError
+
+# =====================
+# EVENT CRUD
+# =====================
+def create_event(db: Session, name: str):
+    event = Event(name=name, status="active")
+    db.add(event)
+    db.commit()
+    db.refresh(event)
+    return event
+
+def get_event(db: Session, event_id: int):
+    return db.query(Event).filter(Event.id == event_id).first()
+
+def get_events(db: Session):
+    return db.query(Event).order_by(Event.id).all()
+
+def archive_event(db: Session, event_id: int):
+    """Makes an event read-only and frees its in-memory scoreboard; its rows stay for the records."""
+    event = get_event(db, event_id)
+    if not event: return None
+    if event.status != "archived":
+        event.status = "archived"
+        event.archived_at = func.now()
+        db.commit()
+        db.refresh(event)
+    boards.drop(event_id)
+    return event
+
+def reset_event(db: Session, event_id: int, keep_teams: bool = False, keep_questions: bool = False):
+    """
+    Deletes an event's scores, plus its teams and its questions unless kept.
+    Every delete is one range on an index led by event_id; other events are untouched.
+    Returns the number of rows deleted per table.
+    """
+    deleted = {"scores": db.query(Score).filter(Score.event_id == event_id).delete(synchronize_session=False)}
+    if not keep_teams:
+        deleted["teams"] = db.query(Team).filter(Team.event_id == event_id).delete(synchronize_session=False)
+    if not keep_questions:
+        deleted["questions"] = db.query(Question).filter(Question.event_id == event_id) \
+            .delete(synchronize_session=False)
+        deleted["categories"] = db.query(Category).filter(Category.event_id == event_id) \
+            .delete(synchronize_session=False)
+    db.commit()
+    boards.get(event_id).invalidate()
+    if not keep_questions:
+        search_index.remove_event(event_id)
+    return deleted
+
+def delete_event(db: Session, event_id: int):
+    """Deletes an event and everything in it. The default event can only be reset."""
+    event = get_event(db, event_id)
+    if not event or event_id == DEFAULT_EVENT_ID: return None
+    reset_event(db, event_id)
+    db.delete(event)
+    db.commit()
+    boards.drop(event_id)
+    return event
 
 # =====================
 # TEAM CRUD
 # =====================
-def create_team(db: Session, name: str, color: str, timer_seconds: int = 30):
-    team = Team(name=name, color=color, timer_seconds=timer_seconds)
+def create_team(db: Session, event_id: int, name: str, color: str, timer_seconds: int = 30):
+    team = Team(event_id=event_id, name=name, color=color, timer_seconds=timer_seconds)
     db.add(team)
     db.commit()
     db.refresh(team)
+    boards.get(event_id).add_team(team.id, team.name)
     return team
 
-def get_team(db: Session, team_id: int):
-    return db.query(Team).filter(Team.id == team_id).first()
+def get_team(db: Session, event_id: int, team_id: int):
+    return db.query(Team).filter(Team.event_id == event_id, Team.id == team_id).first()
 
-def get_teams(db: Session):
-    return db.query(Team).all()
-
-def update_team(db: Session, team_id: int, new_name: str = None, new_color: str = None, new_timer: int = None):
-    team = db.query(Team).filter(Team.id == team_id).first()
+def update_team(db: Session, event_id: int, team_id: int, new_name: str = None, new_color: str = None,
+                new_timer: int = None):
+    team = get_team(db, event_id, team_id)
     if not team: return None
     if new_name: team.name = new_name
     if new_color: team.color = new_color
     if new_timer is not None: team.timer_seconds = new_timer
     db.commit()
     db.refresh(team)
+    boards.get(event_id).rename_team(team.id, team.name)
     return team
 
-def delete_team(db: Session, team_id: int):
-    team = db.query(Team).filter(Team.id == team_id).first()
+def delete_team(db: Session, event_id: int, team_id: int):
+    team = get_team(db, event_id, team_id)
     if team:
         db.delete(team)
         db.commit()
+        boards.get(event_id).remove_team(team_id)
     return team
 
+# =====================
+# CATEGORY CRUD
+# =====================
+def get_categories(db: Session, event_id: int):
+    return db.query(Category).filter(Category.event_id == event_id).order_by(Category.id).all()
+
+def get_category(db: Session, event_id: int, category_id: int):
+    return db.query(Category).filter(Category.event_id == event_id, Category.id == category_id).first()
+
+def get_or_create_category(db: Session, event_id: int, name: str):
+    """Returns the event's category called ``name``, adding it (uncommitted) if new; None for no name."""
+    if not name:
+        return None
+    category = db.query(Category).filter(Category.event_id == event_id, Category.name == name).first()
+    if not category:
+        category = Category(event_id=event_id, name=name)
+        db.add(category)
+        db.flush()
+    return category
+
+def get_category_ids(db: Session, event_id: int, names):
+    """Maps each category name to its id in the event, adding (uncommitted) any that are new."""
+    names = {n for n in names if n}
+    ids = dict(
+        db.query(Category.name, Category.id).filter(Category.event_id == event_id, Category.name.in_(names)).all()
+    ) if names else {}
+    missing = [Category(event_id=event_id, name=n) for n in sorted(names - ids.keys())]
+    if missing:
+        db.add_all(missing)
+        db.flush()
+        ids.update((c.name, c.id) for c in missing)
+    return ids
+
 # =====================
 # QUESTION CRUD
 # =====================
-def create_question(db: Session, text: str, answer: str, category: str = None, points: int = 10, options=None):
-    question = Question(text=text, answer=answer, category=category, points=points, options=options)
-    db.add(question)
+def create_question(db: Session, event_id: int, text: str, answer: str, category: str = None, points: int = 10,
+                    options=None):
+    """Creates a question, or updates the event's existing copy of the same text in the same category."""
+    text_hash = question_text_hash(text)
+    question = (
+        db.query(Question)
+        .filter(Question.event_id == event_id,
+                func.coalesce(Question.category, "") == (category or ""), Question.text_hash == text_hash)
+        .first()
+    )
+    if question:
+        question.text, question.answer, question.points, question.options = text, answer, points, options
+    else:
+        category_ref = get_or_create_category(db, event_id, category)
+        question = Question(event_id=event_id, text=text, answer=answer, category=category, points=points,
+                            options=options, text_hash=text_hash,
+                            category_id=category_ref.id if category_ref else None)
+        db.add(question)
     db.commit()
     db.refresh(question)
+    boards.get(event_id).add_category(question.category, question.category_id)
+    search_index.add(question.id, event_id, question.text, question.answer, question.category)
     return question
 
-def get_questions(db: Session, category: str = None):
-    q = db.query(Question)
-    if category:
-        q = q.filter(Question.category == category)
-    return q.all()
+def _question_upsert(db: Session):
+    """INSERT ... ON CONFLICT (event_id, coalesce(category, ''), text_hash) DO UPDATE, where the dialect supports it."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        return None
+    stmt = dialect_insert(Question)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Question.event_id, func.coalesce(Question.category, literal_column("''")),
+                        Question.text_hash],
+        set_={
+            "text": stmt.excluded.text,
+            "answer": stmt.excluded.answer,
+            "points": stmt.excluded.points,
+            "options": stmt.excluded.options,
+        },
+    )
+    return stmt.returning(Question.id, sort_by_parameter_order=True)
+
+def _upsert_batch_fallback(db: Session, event_id: int, batch):
+    hashes = {r["text_hash"] for r in batch}
+    existing = {
+        (category or "", text_hash): qid
+        for qid, category, text_hash in db.query(Question.id, Question.category, Question.text_hash)
+        .filter(Question.event_id == event_id, Question.text_hash.in_(hashes))
+    }
+    ids = []
+    for row in batch:
+        qid = existing.get((row["category"] or "", row["text_hash"]))
+        if qid is None:
+            qid = db.scalar(insert(Question).returning(Question.id), row)
+        else:
+            db.query(Question).filter(Question.id == qid).update(
+                {k: row[k] for k in ("text", "answer", "points", "options")}
+            )
+        ids.append(qid)
+    return ids
+
+def bulk_create_questions(db: Session, event_id: int, rows, batch_size: int = 500):
+    """
+    Upserts many questions into an event in one transaction, one multi-row statement per batch.
+    rows: dicts with text, answer, category, points, options.
+    A question already stored in the same category (same normalized text) is
+    updated instead of duplicated; repeats inside ``rows`` keep the last one.
+    Returns the question ids in input order; nothing is kept if any batch fails.
+    """
+    unique = {}
+    for row in rows:
+        row = dict(row, event_id=event_id, text_hash=question_text_hash(row["text"]))
+        key = (row["category"] or "", row["text_hash"])
+        unique.pop(key, None)
+        unique[key] = row
+    rows = list(unique.values())
+
+    ids = []
+    stmt = _question_upsert(db)
+    try:
+        category_ids = get_category_ids(db, event_id, (r["category"] for r in rows))
+        for row in rows:
+            row["category_id"] = category_ids.get(row["category"])
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            if stmt is not None:
+                ids.extend(db.scalars(stmt, batch).all())
+            else:
+                ids.extend(_upsert_batch_fallback(db, event_id, batch))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    board = boards.get(event_id)
+    for category, category_id in category_ids.items():
+        board.add_category(category, category_id)
+    for qid, row in zip(ids, rows):
+        search_index.add(qid, event_id, row["text"], row["answer"], row["category"])
+    return ids
+
+# Columns a question projection may ask for; PRESENTER_FIELDS never includes the answer
+QUESTION_FIELDS = ("id", "text", "answer", "category", "category_id", "points", "options")
+PRESENTER_FIELDS = ("id", "text", "category", "category_id", "points", "options")
+
+def get_question_page(db: Session, event_id: int, category_id: int = None, after: int = None, limit: int = None,
+                      fields=QUESTION_FIELDS):
+    """
+    Keyset page of an event's questions ordered by id, as dicts holding only ``fields``.
+    Returns (rows, next_cursor); next_cursor is the id to pass as ``after`` or None at the end.
+    """
+    # Core select of plain columns: rows come back as tuples, no ORM identity map
+    columns = [getattr(Question, f) for f in dict.fromkeys(("id",) + tuple(fields))]
+    q = select(*columns).where(Question.event_id == event_id)
+    if category_id is not None:
+        q = q.where(Question.category_id == category_id)
+    if after is not None:
+        q = q.where(Question.id > after)
+    q = q.order_by(Question.id)
+    if limit:
+        q = q.limit(limit + 1)
+    rows = [dict(r) for r in db.execute(q).mappings()]
+
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1]["id"]
+    return rows, next_cursor
+
+def get_question_with_neighbours(db: Session, event_id: int, question_id: int, fields=QUESTION_FIELDS):
+    """One question as a dict plus the previous/next question ids in its category."""
+    columns = [getattr(Question, f) for f in dict.fromkeys(("id", "category_id") + tuple(fields))]
+    row = db.query(*columns).filter(Question.event_id == event_id, Question.id == question_id).first()
+    if not row:
+        return None
 
-def update_question(db: Session, question_id: int, text=None, answer=None, category=None, points=None, options=None):
-    question = db.query(Question).filter(Question.id == question_id).first()
+    same_category = (Question.category_id == row.category_id) if row.category_id is not None \
+        else (Question.event_id == event_id) & Question.category_id.is_(None)
+    question = {k: v for k, v in row._mapping.items() if k in fields or k == "id"}
+    question["prev_id"] = db.query(func.max(Question.id)).filter(same_category, Question.id < question_id).scalar()
+    question["next_id"] = db.query(func.min(Question.id)).filter(same_category, Question.id > question_id).scalar()
+    return question
+
+def search_questions(db: Session, event_id: int, query: str, category: str = None, offset: int = 0,
+                     limit: int = 20, fields=QUESTION_FIELDS):
+    """
+    Ranked full-text search over an event's question text, answer and category, as dicts holding only ``fields``.
+    Returns (rows, next_offset); next_offset is None on the last page.
+    """
+    ids = ranked_question_ids(db, event_id, query, category, offset, limit + 1)
+    next_offset = offset + limit if len(ids) > limit else None
+    ids = ids[:limit]
+    if not ids:
+        return [], None
+    columns = [getattr(Question, f) for f in dict.fromkeys(("id",) + tuple(fields))]
+    found = {r["id"]: dict(r) for r in db.execute(select(*columns).where(Question.id.in_(ids))).mappings()}
+    return [found[qid] for qid in ids if qid in found], next_offset
+
+def update_question(db: Session, event_id: int, question_id: int, text=None, answer=None, category=None,
+                    points=None, options=None):
+    question = db.query(Question).filter(Question.event_id == event_id, Question.id == question_id).first()
     if not question: return None
-    if text: question.text = text
+    if text:
+        question.text = text
+        question.text_hash = question_text_hash(text)
     if answer: question.answer = answer
-    if category: question.category = category
+    if category:
+        question.category = category
+        question.category_id = get_or_create_category(db, event_id, category).id
     if points is not None: question.points = points
     if options is not None: question.options = options
     db.commit()
     db.refresh(question)
+    boards.get(event_id).invalidate()  # category may have moved existing scores
+    search_index.add(question.id, event_id, question.text, question.answer, question.category)
     return question
 
-def clear_all_questions(db: Session):
-    count = db.query(Question).delete()
-    db.commit()
-    return count
+def clear_questions(db: Session, event_id: int):
+    """Deletes an event's questions, categories and the scores awarded on them."""
+    return reset_event(db, event_id, keep_teams=True)["questions"]
 
-def delete_question(db: Session, question_id: int):
-    question = db.query(Question).filter(Question.id == question_id).first()
+def delete_question(db: Session, event_id: int, question_id: int):
+    question = db.query(Question).filter(Question.event_id == event_id, Question.id == question_id).first()
     if question:
         db.delete(question)
         db.commit()
+        boards.get(event_id).invalidate()
+        search_index.remove(question_id)
     return question
 
 # =====================
 # SCORE CRUD
 # =====================
-def award_points(db: Session, team_id: int, question_id: int, points: int):
-    score = Score(team_id=team_id, question_id=question_id, points_awarded=points)
-    db.add(score)
+def latest_awards(awards):
+    """{(team_id, question_id): points} from (team_id, question_id, points) triples; later ones win."""
+    latest = {}
+    for team_id, question_id, points in awards:
+        latest[(team_id, question_id)] = points
+    return latest
+
+# Attempts at an award batch that keeps losing races with concurrent awards
+AWARD_ATTEMPTS = 5
+
+class StaleScore(Exception):
+    """A score changed between reading it and updating it; the award is retried."""
+
+def rescore(changes):
+    """
+    One UPDATE setting [(score, points)] that only touches scores still holding the points
+    they were read with, so two concurrent re-awards can never both apply a delta from the
+    same old value. Its rowcount falls short of len(changes) if one lost that race.
+    """
+    still_old = [
+        and_(Score.id == score.id,
+             Score.points_awarded.is_(None) if score.points_awarded is None
+             else Score.points_awarded == score.points_awarded)
+        for score, _ in changes
+    ]
+    return update(Score).where(or_(*still_old)) \
+        .values(points_awarded=case({score.id: points for score, points in changes}, value=Score.id)) \
+        .execution_options(synchronize_session=False)
+
+def _upsert_scores(db: Session, event_id: int, latest):
+    """Writes the awards and returns each one's change in points as (team_id, question_id, delta)."""
+    existing = {
+        (s.team_id, s.question_id): s
+        for s in db.query(Score).filter(tuple_(Score.team_id, Score.question_id).in_(list(latest)))
+    }
+    deltas, new, changed = [], [], []
+    for (team_id, question_id), points in latest.items():
+        score = existing.get((team_id, question_id))
+        if score is None:
+            new.append({"event_id": event_id, "team_id": team_id, "question_id": question_id,
+                        "points_awarded": points})
+            deltas.append((team_id, question_id, points))
+        elif score.points_awarded != points:
+            changed.append((score, points))
+            deltas.append((team_id, question_id, points - (score.points_awarded or 0)))
+    if changed and db.execute(rescore(changed)).rowcount != len(changed):
+        raise StaleScore()
+    if new:
+        db.execute(insert(Score), new)  # one multi-row INSERT
     db.commit()
-    db.refresh(score)
-    return score
+    for score, points in changed:
+        set_committed_value(score, "points_awarded", points)
+    return deltas
 
-def get_scores_for_team(db: Session, team_id: int):
-    return db.query(Score).filter(Score.team_id == team_id).all()
+def award_points_batch(db: Session, event_id: int, awards):
+    """
+    Sets the points of many (team_id, question_id, points) awards in one transaction.
+    There is one score per team per question: awarding it again replaces the points.
+    Returns None, storing nothing, if any team or question is not in the event.
+    """
+    latest = latest_awards(awards)
+    if not latest:
+        return []
+    team_ids, question_ids = {t for t, _ in latest}, {q for _, q in latest}
+    categories = dict(db.query(Question.id, Question.category)
+                      .filter(Question.event_id == event_id, Question.id.in_(question_ids)))
+    found_teams = db.query(func.count(Team.id)).filter(Team.event_id == event_id, Team.id.in_(team_ids)).scalar()
+    if found_teams != len(team_ids) or len(categories) != len(question_ids):
+        return None
+    board = boards.get(event_id)
+    epoch = board.epoch()  # a reload after this may already count the write below
+    for attempt in range(AWARD_ATTEMPTS):
+        try:
+            deltas = _upsert_scores(db, event_id, latest)
+            break
+        except (IntegrityError, StaleScore):
+            # a concurrent request inserted or re-awarded one of these pairs first; redo it on top
+            db.rollback()
+            if attempt == AWARD_ATTEMPTS - 1:
+                raise
 
-def get_scoreboard(db: Session):
-    results = (
-        db.query(
-            Team.id.label("team_id"),
-            Team.name.label("team_name"),
-            func.coalesce(func.sum(Score.points_awarded), 0).label("total_points")
-        )
-        .outerjoin(Score, Team.id == Score.team_id)  # ✅ outer join so teams with no scores still show
-        .group_by(Team.id)
-        .order_by(func.coalesce(func.sum(Score.points_awarded), 0).desc())
-        .all()
-    )
-    return [{"team_id": r.team_id, "team_name": r.team_name, "total_points": r.total_points} for r in results]
+    changes = [(team_id, categories.get(question_id), delta) for team_id, question_id, delta in deltas if delta]
+    if changes:
+        board.award_batch(changes, epoch)
+    # the stored scores, read back in one query, in award order
+    scores = {(s.team_id, s.question_id): s
+              for s in db.query(Score).filter(tuple_(Score.team_id, Score.question_id).in_(list(latest)))}
+    return [scores[pair] for pair in latest]
 
-def get_categories_from_questions(db: Session):
-    categories = db.query(distinct(Question.category)).all()
-    return [c[0] for c in categories if c[0] is not None]
+def award_points(db: Session, event_id: int, team_id: int, question_id: int, points: int):
+    scores = award_points_batch(db, event_id, [(team_id, question_id, points)])
+    return scores[0] if scores else None
 
-def get_questions_by_category(db: Session, category: str):
-    return db.query(Question).filter(Question.category == category).all()
+def get_scores_for_team(db: Session, event_id: int, team_id: int):
+    return db.query(Score).filter(Score.event_id == event_id, Score.team_id == team_id).all()
 
-def get_scoreboard_by_category(db: Session, category: str):
-    results = (
+def get_team_category_totals(db: Session, event_id: int):
+    """One grouped aggregate over an event: points per (team, category id); teams without scores get a None category row."""
+    return (
         db.query(
             Team.id.label("team_id"),
             Team.name.label("team_name"),
+            Question.category_id.label("category_id"),
             func.coalesce(func.sum(Score.points_awarded), 0).label("points")
         )
         .outerjoin(Score, Team.id == Score.team_id)
         .outerjoin(Question, Score.question_id == Question.id)
-        .filter(Question.category == category)  # ✅ filter only this category
-        .group_by(Team.id)
-        .order_by(func.coalesce(func.sum(Score.points_awarded), 0).desc())
+        .filter(Team.event_id == event_id)
+        .group_by(Team.id, Team.name, Question.category_id)
         .all()
     )
-    return [{"team_id": r.team_id, "team_name": r.team_name, "points": r.points} for r in results]
+
+# =====================
+# SCORE HISTORY
+# =====================
+TIMELINE_BUCKETS = ("minute", "hour", "day")
+_SQLITE_BUCKET_FORMATS = {"minute": "%Y-%m-%dT%H:%M:00", "hour": "%Y-%m-%dT%H:00:00", "day": "%Y-%m-%dT00:00:00"}
+
+_BUCKET_START = {"minute": {"second": 0, "microsecond": 0},
+                 "hour": {"minute": 0, "second": 0, "microsecond": 0},
+                 "day": {"hour": 0, "minute": 0, "second": 0, "microsecond": 0}}
+
+def _time_bucket(db: Session, bucket: str):
+    """Score.created_at truncated to the start of its minute/hour/day in SQL, or None for other dialects."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        return func.date_trunc(literal_column(f"'{bucket}'"), Score.created_at)
+    if dialect == "sqlite":
+        return func.strftime(literal_column(f"'{_SQLITE_BUCKET_FORMATS[bucket]}'"), Score.created_at)
+    return None
+
+def _timeline_rows(db: Session, event_id: int, time_bucket):
+    """(team_id, time, points, total) per team and bucket: a grouped aggregate with a running SUM() OVER it."""
+    time_bucket = time_bucket.label("time")
+    per_bucket = (
+        select(Score.team_id, time_bucket, func.sum(Score.points_awarded).label("points"))
+        .where(Score.event_id == event_id)
+        .group_by(Score.team_id, time_bucket)
+        .subquery()
+    )
+    running_total = func.sum(per_bucket.c.points).over(
+        partition_by=per_bucket.c.team_id, order_by=per_bucket.c.time
+    )
+    return db.execute(
+        select(per_bucket.c.team_id, per_bucket.c.time, per_bucket.c.points, running_total.label("total"))
+        .order_by(per_bucket.c.team_id, per_bucket.c.time)
+    )
+
+def _timeline_rows_fallback(db: Session, event_id: int, bucket: str):
+    """The same rows for dialects without SQL above: buckets summed while streaming scores in (team, time) order."""
+    scores = db.execute(
+        select(Score.team_id, Score.created_at, Score.points_awarded)
+        .where(Score.event_id == event_id, Score.created_at.is_not(None))
+        .order_by(Score.team_id, Score.created_at)
+        .execution_options(yield_per=1000)
+    )
+    team, time, points, total = None, None, 0, 0
+    for team_id, created_at, awarded in scores:
+        start = created_at.replace(**_BUCKET_START[bucket])
+        if (team_id, start) != (team, time):
+            if team is not None:
+                yield team, time, points, total
+            if team_id != team:
+                total = 0
+            team, time, points = team_id, start, 0
+        points += awarded or 0
+        total += awarded or 0
+    if team is not None:
+        yield team, time, points, total
+
+def get_score_timeline(db: Session, event_id: int, bucket: str = "minute"):
+    """
+    Each team's points per time bucket and its running total, for a progression chart.
+    One grouped aggregate in the database with SUM() OVER (PARTITION BY team) on top;
+    only one row per team per bucket with scores comes back, however many awards there are.
+    Dialects without a bucket expression stream the scores and sum them here instead.
+    """
+    time_bucket = _time_bucket(db, bucket)
+    if time_bucket is not None:
+        rows = _timeline_rows(db, event_id, time_bucket)
+    else:
+        rows = _timeline_rows_fallback(db, event_id, bucket)
+    series = {team.id: {"team_id": team.id, "team_name": team.name, "points": []}
+              for team in db.query(Team.id, Team.name).filter(Team.event_id == event_id).order_by(Team.id)}
+    for team_id, time, points, total in rows:
+        if team_id in series:
+            series[team_id]["points"].append({"time": time, "points": points, "total": total})
+    return {"bucket": bucket, "series": list(series.values())}
+
+# =====================
+# LIVE SCOREBOARD (in-memory)
+# =====================
+def load_scoreboard(db: Session, event_id: int):
+    """(Re)builds an event's in-memory scoreboard from the database."""
+    board = boards.get(event_id)
+    generation = board.generation()
+    categories = [(c.id, c.name) for c in get_categories(db, event_id)]
+    names = dict(categories)
+    rows = get_team_category_totals(db, event_id)
+    teams = {r.team_id: r.team_name for r in rows}
+    board.load(teams.items(), categories, [(r.team_id, names.get(r.category_id), r.points) for r in rows],
+               generation)
+    return board
+
+def get_live_scoreboard(db: Session, event_id: int):
+    """Returns the event's in-memory scoreboard, loading it from the database if needed."""
+    board = boards.get(event_id)
+    for _ in range(3):  # a load is dropped if scores changed while it ran
+        if board.is_loaded():
+            break
+        load_scoreboard(db, event_id)
+    return board
@@ -1,4 +1,6 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
@@ -10,13 +12,59 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL not found. Please check your .env file.")
 
+# Connection pool tuning (ignored for SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
 
 
-# Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+def _async_url(url: str):
+    """The same database through its asyncio driver (asyncpg / aiosqlite)."""
+    url = make_url(url.replace("postgres://", "postgresql://", 1))
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        url = url.set(drivername="postgresql+asyncpg")
+        # asyncpg spells libpq's sslmode as ssl
+        if "sslmode" in url.query:
+            query = dict(url.query)
+            query["ssl"] = query.pop("sslmode")
+            url = url.set(query=query)
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url
+
+
+def _engine_options(url, asyncio: bool = False):
+    url = make_url(url)
+    if url.get_backend_name() == "sqlite":
+        return {}
+    options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+    if DB_STATEMENT_TIMEOUT_MS and url.get_backend_name() == "postgresql":
+        if asyncio:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+
+# Create SQLAlchemy engine (sync: migrations, reset.py, background jobs and the remaining sync routes)
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory for the high-traffic routes
+async_engine = create_async_engine(_async_url(DATABASE_URL), **_engine_options(DATABASE_URL, asyncio=True))
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Base class for models
 Base = declarative_base()
@@ -0,0 +1,253 @@
+"""
+Versioned schema migrations.
+
+create_all() only creates missing tables; it never adds columns or indexes
+to tables that already exist. Each migration below upgrades an existing
+database to the current models and is safe on a fresh one. Applied
+versions are recorded in the schema_version table.
+
+    python -m database.migrate
+"""
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import DBAPIError
+
+from .db import Base, engine
+from .models import question_text_hash, DEFAULT_EVENT_ID
+
+MIGRATIONS = []
+
+
+def migration(version: int, description: str):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        return fn
+    return register
+
+
+def _columns(conn, table):
+    return {c["name"] for c in inspect(conn).get_columns(table)}
+
+
+def _default_event_id(conn):
+    """
+    The event that rows from before events existed belong to; created on first use.
+    Always DEFAULT_EVENT_ID, which the root routes serve: the id is given explicitly,
+    since a sequence value used by a failed, rolled-back attempt is not handed out again.
+    """
+    if not conn.execute(text("SELECT 1 FROM events WHERE id = :id"), {"id": DEFAULT_EVENT_ID}).first():
+        conn.execute(text("INSERT INTO events (id, name, status) VALUES (:id, 'Default event', 'active')"),
+                     {"id": DEFAULT_EVENT_ID})
+        if conn.dialect.name == "postgresql":
+            # the explicit id bypassed the sequence; keep it ahead of every used id
+            conn.execute(text("SELECT setval(pg_get_serial_sequence('events', 'id'), (SELECT MAX(id) FROM events))"))
+    return DEFAULT_EVENT_ID
+
+
+# =====================
+# Migrations
+# =====================
+@migration(1, "questions.text_hash with a unique per-category index")
+def add_question_text_hash(conn):
+    if "text_hash" not in _columns(conn, "questions"):
+        conn.execute(text("ALTER TABLE questions ADD COLUMN text_hash VARCHAR(64)"))
+
+    # Backfill; existing duplicates keep a NULL hash so the unique index can be built
+    seen = set(conn.execute(text(
+        "SELECT COALESCE(category, ''), text_hash FROM questions WHERE text_hash IS NOT NULL"
+    )).all())
+    updates = []
+    for qid, category, q_text in conn.execute(text(
+        "SELECT id, category, text FROM questions WHERE text_hash IS NULL ORDER BY id"
+    )):
+        key = (category or "", question_text_hash(q_text))
+        if key in seen:
+            continue
+        seen.add(key)
+        updates.append({"id": qid, "text_hash": key[1]})
+    if updates:
+        conn.execute(text("UPDATE questions SET text_hash = :text_hash WHERE id = :id"), updates)
+
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_questions_category_text_hash "
+        "ON questions (COALESCE(category, ''), text_hash)"
+    ))
+
+
+@migration(2, "categories table with indexed questions.category_id")
+def add_categories(conn):
+    # the categories table itself comes from create_all()
+    if "category_id" not in _columns(conn, "questions"):
+        conn.execute(text(
+            "ALTER TABLE questions ADD COLUMN category_id INTEGER "
+            "REFERENCES categories (id) ON DELETE SET NULL"
+        ))
+
+    # Backfill in order of first appearance, so ids follow the old listing
+    # (a categories table created by the current models already has event_id)
+    if "event_id" in _columns(conn, "categories"):
+        columns, values = "event_id, name", f"{_default_event_id(conn)}, category"
+    else:
+        columns, values = "name", "category"
+    conn.execute(text(
+        f"INSERT INTO categories ({columns}) "
+        f"SELECT {values} FROM questions "
+        "WHERE category IS NOT NULL AND category NOT IN (SELECT name FROM categories) "
+        "GROUP BY category ORDER BY MIN(id)"
+    ))
+    conn.execute(text(
+        "UPDATE questions SET category_id = "
+        "(SELECT categories.id FROM categories WHERE categories.name = questions.category) "
+        "WHERE category IS NOT NULL AND category_id IS NULL"
+    ))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_questions_category_id ON questions (category_id)"))
+
+
+@migration(3, "composite (category_id, id) index for keyset pages")
+def add_question_category_keyset_index(conn):
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_questions_category_id_id ON questions (category_id, id)"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_questions_category_id"))
+
+
+@migration(4, "one score per (team, question) plus score lookup indexes")
+def add_score_uniqueness(conn):
+    # Repeated awards (double taps, client retries) collapse to the latest one
+    conn.execute(text(
+        "DELETE FROM scores WHERE id NOT IN "
+        "(SELECT MAX(id) FROM scores GROUP BY team_id, question_id)"
+    ))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_scores_team_question ON scores (team_id, question_id)"
+    ))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_scores_question_id ON scores (question_id)"))
+
+
+@migration(5, "full-text search index over questions")
+def add_question_search(conn):
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        conn.execute(text(
+            "ALTER TABLE questions ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('simple', coalesce(text, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(answer, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(category, '')), 'C')) STORED"
+        ))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_questions_search ON questions USING GIN (search_vector)"))
+    elif dialect == "sqlite" and conn.execute(text("SELECT sqlite_compileoption_used('ENABLE_FTS5')")).scalar():
+        # External-content table: stores only the index, triggers keep it in step with questions
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5("
+            "text, answer, category, content='questions', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS questions_fts_insert AFTER INSERT ON questions BEGIN "
+            "INSERT INTO questions_fts (rowid, text, answer, category) "
+            "VALUES (new.id, new.text, new.answer, new.category); END"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS questions_fts_delete AFTER DELETE ON questions BEGIN "
+            "INSERT INTO questions_fts (questions_fts, rowid, text, answer, category) "
+            "VALUES ('delete', old.id, old.text, old.answer, old.category); END"
+        ))
+        conn.execute(text(
+            "CREATE TRIGGER IF NOT EXISTS questions_fts_update AFTER UPDATE OF text, answer, category ON questions "
+            "BEGIN "
+            "INSERT INTO questions_fts (questions_fts, rowid, text, answer, category) "
+            "VALUES ('delete', old.id, old.text, old.answer, old.category); "
+            "INSERT INTO questions_fts (rowid, text, answer, category) "
+            "VALUES (new.id, new.text, new.answer, new.category); END"
+        ))
+        conn.execute(text("INSERT INTO questions_fts (questions_fts) VALUES ('rebuild')"))
+    # other databases search through the in-memory index in database/search.py
+
+
+@migration(6, "events: event_id on teams, categories, questions and scores")
+def add_events(conn):
+    # the events table itself comes from create_all(); existing rows join the default event
+    event_id = _default_event_id(conn)
+    for table in ("teams", "categories", "questions", "scores"):
+        if "event_id" not in _columns(conn, table):
+            conn.execute(text(
+                f"ALTER TABLE {table} ADD COLUMN event_id INTEGER REFERENCES events (id) ON DELETE CASCADE"
+            ))
+        conn.execute(text(f"UPDATE {table} SET event_id = :event_id WHERE event_id IS NULL"), {"event_id": event_id})
+        if conn.dialect.name == "postgresql":
+            conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN event_id SET NOT NULL"))
+
+    # names and question copies become unique per event instead of globally
+    conn.execute(text("DROP INDEX IF EXISTS ix_teams_name"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_categories_name"))
+    conn.execute(text("DROP INDEX IF EXISTS uq_questions_category_text_hash"))
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_teams_event_name ON teams (event_id, name)"))
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS uq_categories_event_name ON categories (event_id, name)"))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_questions_event_category_text_hash "
+        "ON questions (event_id, COALESCE(category, ''), text_hash)"
+    ))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_questions_event_id_id ON questions (event_id, id)"))
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_scores_event_team ON scores (event_id, team_id)"))
+
+
+@migration(7, "scores (team_id, created_at) index for the score timeline")
+def add_score_time_index(conn):
+    conn.execute(text("CREATE INDEX IF NOT EXISTS ix_scores_team_created ON scores (team_id, created_at)"))
+
+
+@migration(8, "accent-insensitive PostgreSQL search through unaccent, like FTS5 and the memory index")
+def unaccent_question_search(conn):
+    if conn.dialect.name != "postgresql":
+        return
+    try:
+        with conn.begin_nested():
+            conn.execute(text("CREATE EXTENSION IF NOT EXISTS unaccent"))
+    except DBAPIError:
+        return  # not installed or not permitted: database/search.py keeps query accents to match
+    schema = conn.execute(text(
+        "SELECT extnamespace::regnamespace::text FROM pg_extension WHERE extname = 'unaccent'"
+    )).scalar()
+    # unaccent() is only STABLE; a generated column needs an IMMUTABLE function
+    conn.execute(text(
+        "CREATE OR REPLACE FUNCTION quiz_unaccent(text) RETURNS text "
+        "LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT AS "
+        f"$$ SELECT {schema}.unaccent('{schema}.unaccent'::regdictionary, $1) $$"
+    ))
+    conn.execute(text("DROP INDEX IF EXISTS ix_questions_search"))
+    conn.execute(text("ALTER TABLE questions DROP COLUMN IF EXISTS search_vector"))
+    conn.execute(text(
+        "ALTER TABLE questions ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', quiz_unaccent(coalesce(text, ''))), 'A') || "
+        "setweight(to_tsvector('simple', quiz_unaccent(coalesce(answer, ''))), 'B') || "
+        "setweight(to_tsvector('simple', quiz_unaccent(coalesce(category, ''))), 'C')) STORED"
+    ))
+    conn.execute(text("CREATE INDEX ix_questions_search ON questions USING GIN (search_vector)"))
+
+
+# =====================
+# Runner
+# =====================
+def current_version(conn) -> int:
+    conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER PRIMARY KEY)"))
+    return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_version")).scalar()
+
+
+def upgrade(bind=engine):
+    """Creates missing tables, then applies pending migrations in order, each in its own transaction."""
+    Base.metadata.create_all(bind=bind)
+    with bind.begin() as conn:
+        version = current_version(conn)
+
+    applied = []
+    for number, description, fn in sorted(MIGRATIONS, key=lambda m: m[0]):
+        if number <= version:
+            continue
+        with bind.begin() as conn:
+            fn(conn)
+            conn.execute(text("INSERT INTO schema_version (version) VALUES (:v)"), {"v": number})
+        applied.append((number, description))
+    return applied
+
+
+if __name__ == "__main__":
+    for number, description in upgrade():
+        print(f"✅ Applied migration {number}: {description}")
+    print("✅ Schema up to date")
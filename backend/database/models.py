@@ -1,39 +1,109 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, func, JSON
+import hashlib
+import re
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, func, JSON, Index, literal_column
 from sqlalchemy.orm import relationship
 from .db import Base
 
+
+def question_text_hash(text: str) -> str:
+    """SHA-256 of the question text ignoring case, punctuation and spacing."""
+    normalized = re.sub(r"[^\w\s]", "", text.casefold())
+    normalized = " ".join(normalized.split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+# Event that routes without an /events/{id} prefix use (created by migration 6)
+DEFAULT_EVENT_ID = 1
+
+
+class Event(Base):
+    """One quiz (a youth-group night, a season); teams, questions and scores belong to exactly one."""
+    __tablename__ = "events"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(100), unique=True, nullable=False)
+    status = Column(String(20), nullable=False, default="active")  # "active" or "archived" (read-only)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    archived_at = Column(DateTime(timezone=True), nullable=True)
+
+
 class Team(Base):
     __tablename__ = "teams"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(100), unique=True, nullable=False, index=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String(100), nullable=False)
     color = Column(String(50), nullable=False)
     timer_seconds = Column(Integer, default=30)
 
     scores = relationship("Score", back_populates="team", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # team names are unique within an event; also serves the event's team list
+        Index("uq_teams_event_name", "event_id", "name", unique=True),
+    )
+
+
+class Category(Base):
+    __tablename__ = "categories"
+
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String(100), nullable=False)
+
+    questions = relationship("Question", back_populates="category_ref")
+
+    __table_args__ = (
+        Index("uq_categories_event_name", "event_id", "name", unique=True),
+    )
+
 
 class Question(Base):
     __tablename__ = "questions"
 
     id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
     text = Column(Text, nullable=False)
     answer = Column(Text, nullable=False)
     options = Column(JSON, nullable=True)
     category = Column(String(100), nullable=True)
+    category_id = Column(Integer, ForeignKey("categories.id", ondelete="SET NULL"), nullable=True)
     points = Column(Integer, default=10)
+    text_hash = Column(String(64), nullable=True)
 
     scores = relationship("Score", back_populates="question", cascade="all, delete-orphan")
+    category_ref = relationship("Category", back_populates="questions")
+
+    __table_args__ = (
+        # category lookups and keyset pages within a category
+        Index("ix_questions_category_id_id", "category_id", "id"),
+        # an event's questions in id order (lists, keyset pages, clearing one event)
+        Index("ix_questions_event_id_id", "event_id", "id"),
+        # one copy of a question per category of an event; re-imports update it in place
+        # (uncategorised questions count as category "")
+        Index("uq_questions_event_category_text_hash",
+              event_id, func.coalesce(category, literal_column("''")), text_hash, unique=True),
+    )
 
 
 class Score(Base):
     __tablename__ = "scores"
 
     id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, ForeignKey("events.id", ondelete="CASCADE"), nullable=False)
     team_id = Column(Integer, ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
-    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False, index=True)
     points_awarded = Column(Integer, default=0)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
     team = relationship("Team", back_populates="scores")
     question = relationship("Question", back_populates="scores")
+
+    __table_args__ = (
+        # one award per team per question (re-awarding updates it); also serves team_id lookups
+        Index("uq_scores_team_question", "team_id", "question_id", unique=True),
+        # an event's scores without touching other events' rows
+        Index("ix_scores_event_team", "event_id", "team_id"),
+        # a team's awards in time order (score timeline)
+        Index("ix_scores_team_created", "team_id", "created_at"),
+    )
@@ -1,11 +1,71 @@
+"""
+Reset quiz data.
+
+    python -m database.reset --event 3                 # one event, through the running server
+    python -m database.reset --event 3 --keep-teams
+    python -m database.reset --all                     # everything; stop the server first
+
+An event reset goes through POST /events/{id}/reset on the running server,
+so its in-memory scoreboard, ETag versions, round cache and search index
+are updated with the rows. Those caches live in each server process: run
+the API as a single worker, or restart the workers after a reset.
+"""
+import argparse
+import json
+import os
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from sqlalchemy import text
+
 from .db import Base, engine
 from .models import Team, Question, Score
+from . import migrate
 
-if __name__ == "__main__":
+API_URL = os.getenv("QUIZ_API_URL", "http://127.0.0.1:8000")
+
+
+def reset_all():
     print("⚠️ Dropping all tables...")
     Base.metadata.drop_all(bind=engine)
+    # tables outside the models: migration bookkeeping and the SQLite search index
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS schema_version"))
+        conn.execute(text("DROP TABLE IF EXISTS questions_fts"))
     print("✅ All tables dropped!")
 
     print("🔄 Creating tables...")
-    Base.metadata.create_all(bind=engine)
-    print("✅ Tables created!")
+    migrate.upgrade()
+    print("✅ Tables created! Restart the server so it drops its in-memory state.")
+
+
+def reset_event(event_id, keep_teams=False, keep_questions=False, api_url=API_URL):
+    query = urllib.parse.urlencode({"keep_teams": keep_teams, "keep_questions": keep_questions}).lower()
+    request = urllib.request.Request(f"{api_url.rstrip('/')}/events/{event_id}/reset?{query}", method="POST")
+    print(f"⚠️ Resetting event {event_id} through {api_url}...")
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            result = json.load(response)
+    except urllib.error.HTTPError as e:
+        raise SystemExit(f"❌ {e.code}: {e.read().decode('utf-8', 'replace')}")
+    except urllib.error.URLError as e:
+        raise SystemExit(f"❌ Server not reachable at {api_url} ({e.reason}); start it or pass --url")
+    for table, count in result["deleted"].items():
+        print(f"   {count} {table} deleted")
+    print("✅ Event reset! Other events were not touched.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reset quiz data")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--event", type=int, metavar="ID", help="delete one event's scores, teams and questions")
+    target.add_argument("--all", action="store_true", help="drop and recreate every table (server stopped)")
+    parser.add_argument("--keep-teams", action="store_true", help="with --event: keep the teams")
+    parser.add_argument("--keep-questions", action="store_true", help="with --event: keep questions and categories")
+    parser.add_argument("--url", default=API_URL, help="with --event: the running API (default $QUIZ_API_URL)")
+    args = parser.parse_args()
+    if args.all:
+        reset_all()
+    else:
+        reset_event(args.event, keep_teams=args.keep_teams, keep_questions=args.keep_questions, api_url=args.url)
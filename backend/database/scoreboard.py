@@ -0,0 +1,236 @@
+import threading
+
+
+class ScoreboardEngine:
+    """
+    In-memory running totals per team and per (team, category).
+
+    Loaded once from the database, then kept current by crud as scores,
+    teams and questions change. Reads return pre-sorted rankings, so their
+    cost does not depend on how many score rows exist.
+
+    State is per process: with several workers each one keeps its own copy.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._generation = 0      # bumped by every change, so a load that raced one is dropped
+        self._epoch = 0           # bumped by every load, so a write that raced one is not applied twice
+        self._teams = {}          # team_id -> team name
+        self._totals = {}         # team_id -> total points
+        self._categories = {}     # category -> {team_id: points}, insertion ordered
+        self._category_ids = {}   # category -> categories.id
+        self._overall = []
+        self._ranked = {}
+        self._listeners = []
+
+    # ---------------------
+    # Loading
+    # ---------------------
+    def is_loaded(self):
+        return self._loaded
+
+    def generation(self):
+        return self._generation
+
+    def epoch(self):
+        return self._epoch
+
+    def load(self, teams, categories, rows, generation=None):
+        """
+        teams: iterable of (team_id, team_name)
+        categories: ordered iterable of (category_id, category name)
+        rows: iterable of (team_id, category, points) aggregates
+
+        If ``generation`` is given and something changed since it was read,
+        the load is dropped: the rows may predate that change.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._teams = dict(teams)
+            self._totals = {team_id: 0 for team_id in self._teams}
+            self._category_ids = {name: category_id for category_id, name in categories}
+            self._categories = {name: {} for name in self._category_ids}
+            for team_id, category, points in rows:
+                if team_id not in self._teams:
+                    continue
+                self._totals[team_id] += points
+                if category in self._categories:
+                    self._categories[category][team_id] = points
+            self._loaded = True
+            self._epoch += 1
+            self._rerank()
+        self._notify()
+        return True
+
+    def invalidate(self):
+        """Drop the in-memory totals; the next read reloads from the database."""
+        with self._lock:
+            self._generation += 1
+            self._loaded = False
+        self._notify()
+
+    # ---------------------
+    # Updates
+    # ---------------------
+    def award_batch(self, awards, epoch=None):
+        """
+        awards: iterable of (team_id, category, points) changes from one committed write.
+
+        ``epoch`` is epoch() read before that write. If the board was loaded
+        since, the load may already hold the write, so the board is
+        invalidated rather than counting the points twice.
+        """
+        with self._lock:
+            self._generation += 1
+            if epoch is not None and epoch != self._epoch:
+                self._loaded = False
+            for team_id, category, points in awards:
+                if not self._loaded or team_id not in self._teams:
+                    self._loaded = False
+                    break
+                self._totals[team_id] += points
+                if category is not None:
+                    scores = self._categories.setdefault(category, {})
+                    scores[team_id] = scores.get(team_id, 0) + points
+            if self._loaded:
+                self._rerank()
+        self._notify()
+
+    def add_team(self, team_id, name):
+        with self._lock:
+            self._generation += 1
+            if self._loaded:
+                self._teams[team_id] = name
+                self._totals.setdefault(team_id, 0)
+                self._rerank()
+        self._notify()
+
+    def rename_team(self, team_id, name):
+        with self._lock:
+            self._generation += 1
+            if not self._loaded or team_id not in self._teams:
+                self._loaded = False
+            else:
+                self._teams[team_id] = name
+                self._rerank()
+        self._notify()
+
+    def remove_team(self, team_id):
+        with self._lock:
+            self._generation += 1
+            if self._loaded:
+                self._teams.pop(team_id, None)
+                self._totals.pop(team_id, None)
+                for scores in self._categories.values():
+                    scores.pop(team_id, None)
+                self._rerank()
+        self._notify()
+
+    def add_category(self, category, category_id):
+        if category is None:
+            return
+        with self._lock:
+            self._generation += 1
+            if not self._loaded or category in self._categories:
+                return
+            self._category_ids[category] = category_id
+            self._categories[category] = {}
+            self._rerank()
+        self._notify()
+
+    # ---------------------
+    # Reads (already sorted)
+    # ---------------------
+    def overall(self):
+        return self._overall
+
+    def by_category(self, category):
+        ranked = self._ranked.get(category)
+        if ranked is None:
+            ranked = self._rank_category({})
+        return ranked
+
+    def full(self):
+        with self._lock:
+            return {
+                "overall": self._overall,
+                "categories": [
+                    {"id": self._category_ids.get(c), "name": str(c), "scores": self._ranked[c]}
+                    for c in self._categories
+                ],
+            }
+
+    # ---------------------
+    # Change listeners
+    # ---------------------
+    def add_listener(self, callback):
+        """callback() is called after every change, including invalidation."""
+        self._listeners.append(callback)
+
+    def _notify(self):
+        for callback in self._listeners:
+            callback()
+
+    # ---------------------
+    # Internals
+    # ---------------------
+    def _rerank(self):
+        self._overall = sorted(
+            ({"team_id": t, "team_name": name, "total_points": self._totals[t]}
+             for t, name in self._teams.items()),
+            key=lambda x: (-x["total_points"], x["team_id"])
+        )
+        self._ranked = {c: self._rank_category(scores) for c, scores in self._categories.items()}
+
+    def _rank_category(self, scores):
+        return sorted(
+            ({"team_id": t, "team_name": name, "points": scores.get(t, 0)}
+             for t, name in self._teams.items()),
+            key=lambda x: (-x["points"], x["team_id"])
+        )
+
+
+class EventBoards:
+    """
+    One ScoreboardEngine per event, created on first use.
+
+    Listeners get the event id after any change to that event's board, so
+    a score in one event never wakes another event's screens.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._boards = {}
+        self._listeners = []
+
+    def get(self, event_id):
+        board = self._boards.get(event_id)
+        if board is None:
+            with self._lock:
+                board = self._boards.get(event_id)
+                if board is None:
+                    board = self._boards[event_id] = ScoreboardEngine()
+                    board.add_listener(lambda: self._notify(event_id))
+        return board
+
+    def drop(self, event_id):
+        """Frees an event's board (archived or deleted event); a later read reloads it."""
+        with self._lock:
+            board = self._boards.pop(event_id, None)
+        if board is not None:
+            board.invalidate()
+
+    def add_listener(self, callback):
+        """callback(event_id) is called after every change to that event's board."""
+        self._listeners.append(callback)
+
+    def _notify(self, event_id):
+        for callback in self._listeners:
+            callback(event_id)
+
+
+# Process-wide boards used by crud and the API
+boards = EventBoards()
@@ -0,0 +1,251 @@
+import math
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+
+from sqlalchemy import text as sql
+from sqlalchemy.orm import Session
+
+from .models import Question
+
+# Field weights: a match in the question text counts most, then the answer, then the category
+FIELD_WEIGHTS = {"text": 3.0, "answer": 1.5, "category": 1.0}
+# A word completed from a prefix ranks below the exact word
+PREFIX_DISCOUNT = 0.5
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(value: str, keep_accents: bool = False):
+    """Case- and accent-insensitive word tokens (matches FTS5's unicode61 remove_diacritics)."""
+    if not value:
+        return []
+    value = value.casefold()
+    if not keep_accents:
+        value = unicodedata.normalize("NFKD", value)
+        value = "".join(c for c in value if not unicodedata.combining(c))
+    return _WORD.findall(value)
+
+
+class QuestionSearchIndex:
+    """
+    In-memory inverted index over question text, answer and category.
+
+    Fallback for databases without a native full-text index. Loaded from
+    the database on the first search, then kept current by crud on create,
+    update, delete, event reset and upload. Ranking is a weighted TF-IDF sum;
+    every query term must match, the last one also as a prefix.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._generation = 0
+        self._postings = defaultdict(dict)   # token -> {question_id: weight}
+        self._docs = {}                      # question_id -> (event_id, category, tokens)
+        self._terms = None                   # sorted tokens for prefix lookups, rebuilt lazily
+
+    # ---------------------
+    # Loading
+    # ---------------------
+    def is_loaded(self):
+        return self._loaded
+
+    def generation(self):
+        return self._generation
+
+    def load(self, rows, generation=None):
+        """
+        rows: iterable of (question_id, event_id, text, answer, category);
+        dropped if anything changed since ``generation``.
+        """
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return False
+            self._postings.clear()
+            self._docs.clear()
+            for row in rows:
+                self._add(*row)
+            self._terms = None
+            self._loaded = True
+        return True
+
+    # ---------------------
+    # Updates
+    # ---------------------
+    def add(self, question_id, event_id, text, answer, category):
+        """Indexes a new question or re-indexes a changed one."""
+        with self._lock:
+            if not self._loaded:
+                self._generation += 1
+                return
+            self._remove(question_id)
+            self._add(question_id, event_id, text, answer, category)
+            self._terms = None
+
+    def remove(self, question_id):
+        with self._lock:
+            if not self._loaded:
+                self._generation += 1
+                return
+            self._remove(question_id)
+            self._terms = None
+
+    def remove_event(self, event_id):
+        with self._lock:
+            if not self._loaded:
+                self._generation += 1
+                return
+            for question_id in [qid for qid, doc in self._docs.items() if doc[0] == event_id]:
+                self._remove(question_id)
+            self._terms = None
+
+    # ---------------------
+    # Search
+    # ---------------------
+    def search(self, query, event_id, category=None, offset=0, limit=20):
+        """Ids of the event's matching questions in rank order, best first."""
+        terms = tokenize(query)
+        if not terms:
+            return []
+        with self._lock:
+            total = len(self._docs) or 1
+            scores = None
+            for position, term in enumerate(terms):
+                matches = {}
+                expansions = self._prefixed(term) if position == len(terms) - 1 else [term]
+                for token in expansions:
+                    postings = self._postings.get(token, {})
+                    idf = math.log(1 + total / (1 + len(postings)))
+                    if token != term:
+                        idf *= PREFIX_DISCOUNT
+                    for question_id, weight in postings.items():
+                        matches[question_id] = max(matches.get(question_id, 0), weight * idf)
+                if scores is None:
+                    scores = matches
+                else:
+                    scores = {qid: s + matches[qid] for qid, s in scores.items() if qid in matches}
+                if not scores:
+                    return []
+            scores = {qid: s for qid, s in scores.items() if self._docs[qid][0] == event_id
+                      and (category is None or self._docs[qid][1] == category)}
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [qid for qid, _ in ranked[offset:offset + limit]]
+
+    # ---------------------
+    # Internals
+    # ---------------------
+    def _add(self, question_id, event_id, text, answer, category):
+        weights = defaultdict(float)
+        for field, value in (("text", text), ("answer", answer), ("category", category)):
+            for token in tokenize(value):
+                weights[token] += FIELD_WEIGHTS[field]
+        for token, weight in weights.items():
+            self._postings[token][question_id] = weight
+        self._docs[question_id] = (event_id, category, tuple(weights))
+
+    def _remove(self, question_id):
+        doc = self._docs.pop(question_id, None)
+        if doc is None:
+            return
+        for token in doc[2]:
+            postings = self._postings.get(token)
+            if postings is not None:
+                postings.pop(question_id, None)
+                if not postings:
+                    del self._postings[token]
+
+    def _prefixed(self, prefix):
+        if self._terms is None:
+            self._terms = sorted(self._postings)
+        start = bisect_left(self._terms, prefix)
+        end = bisect_left(self._terms, prefix + "\U0010ffff")
+        return self._terms[start:end]
+
+
+# Process-wide fallback index used by crud
+search_index = QuestionSearchIndex()
+
+
+# =====================
+# Backends
+# =====================
+_backends = {}
+
+
+def search_backend(db: Session):
+    """
+    'postgres' (tsvector + GIN over unaccented text), 'postgres_accents' (the same
+    where the unaccent extension could not be installed), 'fts5' (SQLite
+    external-content table) or 'memory'.
+    """
+    bind = db.get_bind()
+    backend = _backends.get(bind.url)
+    if backend is None:
+        dialect = bind.dialect.name
+        if dialect == "postgresql" and db.execute(sql(
+            "SELECT 1 FROM information_schema.columns "
+            "WHERE table_name = 'questions' AND column_name = 'search_vector'"
+        )).first():
+            unaccented = db.execute(sql("SELECT 1 FROM pg_proc WHERE proname = 'quiz_unaccent'")).first()
+            backend = "postgres" if unaccented else "postgres_accents"
+        elif dialect == "sqlite" and db.execute(sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'questions_fts'"
+        )).first():
+            backend = "fts5"
+        else:
+            backend = "memory"
+        _backends[bind.url] = backend
+    return backend
+
+
+def _load_index(db: Session):
+    generation = search_index.generation()
+    rows = db.query(Question.id, Question.event_id, Question.text, Question.answer, Question.category).all()
+    return search_index.load(rows, generation=generation)
+
+
+def ranked_question_ids(db: Session, event_id: int, query: str, category: str = None, offset: int = 0,
+                        limit: int = 20):
+    """Ids of the event's questions matching every word of ``query`` (the last one as a prefix), best first."""
+    terms = tokenize(query)
+    if not terms:
+        return []
+    params = {"event_id": event_id, "category": category, "offset": offset, "limit": limit}
+    backend = search_backend(db)
+
+    if backend == "fts5":
+        # quoted terms keep FTS5 operators in user input literal
+        params["match"] = " ".join(f'"{t}"' for t in terms) + "*"
+        return db.scalars(sql(
+            "SELECT questions_fts.rowid FROM questions_fts "
+            "JOIN questions ON questions.id = questions_fts.rowid "
+            "WHERE questions_fts MATCH :match AND questions.event_id = :event_id "
+            "AND (:category IS NULL OR questions.category = :category) "
+            "ORDER BY bm25(questions_fts, 3.0, 1.5, 1.0), questions_fts.rowid "
+            "LIMIT :limit OFFSET :offset"
+        ), params).all()
+
+    if backend in ("postgres", "postgres_accents"):
+        if backend == "postgres":
+            # unaccent on both sides (it also folds letters like ø that NFKD leaves alone)
+            tsquery = "to_tsquery('simple', quiz_unaccent(:query))"
+        else:
+            # without unaccent the stored words keep their accents, so the query's must too
+            terms = tokenize(query, keep_accents=True)
+            tsquery = "to_tsquery('simple', :query)"
+        params["query"] = " & ".join(terms[:-1] + [terms[-1] + ":*"])
+        return db.scalars(sql(
+            f"SELECT id FROM questions, {tsquery} query "
+            "WHERE search_vector @@ query AND event_id = :event_id "
+            "AND (CAST(:category AS TEXT) IS NULL OR category = :category) "
+            "ORDER BY ts_rank_cd(search_vector, query) DESC, id "
+            "LIMIT :limit OFFSET :offset"
+        ), params).all()
+
+    for _ in range(3):
+        if search_index.is_loaded() or _load_index(db):
+            break
+    return search_index.search(query, event_id, category, offset, limit)
@@ -0,0 +1,60 @@
+import os
+import threading
+
+from fastapi import Depends, HTTPException, Request, Response
+
+from events import request_event_id
+
+
+class ResourceVersions:
+    """
+    Version counter per event and resource name ("teams", "questions", "scores").
+
+    Mutating routes bump the counters they affect; read routes derive an
+    ETag from them, so a matching If-None-Match can be answered with 304
+    before any database or serialization work. Tags are weak: the same
+    version is equivalent whether it goes out plain or compressed. The
+    boot token keeps tags from a previous process (whose counters
+    restarted at 0) from ever matching.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._boot = os.urandom(4).hex()
+
+    def bump(self, event_id, *resources):
+        with self._lock:
+            for name in resources:
+                key = (event_id, name)
+                self._versions[key] = self._versions.get(key, 0) + 1
+
+    def version(self, event_id, resource):
+        return self._versions.get((event_id, resource), 0)
+
+    def etag(self, event_id, *resources):
+        parts = "-".join(f"{name}.{self._versions.get((event_id, name), 0)}" for name in resources)
+        return f'W/"{self._boot}-e{event_id}-{parts}"'
+
+
+versions = ResourceVersions()
+
+
+def _if_none_match(request: Request):
+    header = request.headers.get("if-none-match")
+    if not header:
+        return []
+    # If-None-Match uses weak comparison: W/"x" and "x" match
+    return [tag.strip().removeprefix("W/") for tag in header.split(",")]
+
+
+def etag_for(*resources):
+    """Route dependency: 304 when the client's copy is current, else tag the response."""
+    async def check(request: Request, response: Response):
+        etag = versions.etag(request_event_id(request), *resources)
+        tags = _if_none_match(request)
+        if etag.removeprefix("W/") in tags or "*" in tags:
+            raise HTTPException(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = "no-cache"
+    return Depends(check)
@@ -0,0 +1,64 @@
+import os
+import threading
+import time
+
+from fastapi import HTTPException, Request
+
+from database import async_crud
+from database.db import AsyncSessionLocal
+from database.models import DEFAULT_EVENT_ID
+
+# How long a looked-up event status is trusted before asking the database again
+EVENT_STATUS_TTL = float(os.getenv("EVENT_STATUS_TTL", "5"))
+
+
+def request_event_id(request: Request) -> int:
+    """The event a request is scoped to: /events/{event_id}/... or, at the root, the default event."""
+    return request.path_params.get("event_id", DEFAULT_EVENT_ID)
+
+
+class EventDirectory:
+    """
+    Short-lived cache of each event's status ("active", "archived", or None
+    for no such event), so scoping a request costs no query in the common
+    case. Event routes call forget() after changing an event.
+    """
+
+    def __init__(self, ttl=EVENT_STATUS_TTL):
+        self._lock = threading.Lock()
+        self._status = {}  # event_id -> (checked_at, status)
+        self._ttl = ttl
+
+    async def status(self, event_id):
+        entry = self._status.get(event_id)
+        if entry and time.monotonic() - entry[0] < self._ttl:
+            return entry[1]
+        async with AsyncSessionLocal() as db:
+            event = await async_crud.get_event(db, event_id)
+        status = event.status if event else None
+        with self._lock:
+            self._status[event_id] = (time.monotonic(), status)
+        return status
+
+    def forget(self, event_id):
+        with self._lock:
+            self._status.pop(event_id, None)
+
+
+events = EventDirectory()
+
+
+async def event_scope(request: Request) -> int:
+    """Route dependency: the request's event id; 404 if there is no such event."""
+    event_id = request_event_id(request)
+    if await events.status(event_id) is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    return event_id
+
+
+async def writable_event(request: Request) -> int:
+    """Route dependency for writes: like event_scope, but 409 once the event is archived."""
+    event_id = await event_scope(request)
+    if await events.status(event_id) == "archived":
+        raise HTTPException(status_code=409, detail="Event is archived")
+    return event_id
@@ -0,0 +1,66 @@
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+
+from fastapi import HTTPException
+
+
+class ReplayCache:
+    """
+    Bounded memory of responses by Idempotency-Key.
+
+    A retried request with the same key and body gets the stored response
+    instead of running again; the same key with a different body is
+    rejected. Concurrent requests with one key run one at a time, so a
+    double-tap cannot slip past the check. Entries expire after ttl
+    seconds, and the oldest go first once max_entries is reached.
+    """
+
+    def __init__(self, max_entries=2048, ttl=24 * 3600):
+        self._entries = OrderedDict()  # key -> (stored_at, fingerprint, response)
+        self._locks = {}
+        self._max_entries = max_entries
+        self._ttl = ttl
+
+    @staticmethod
+    def fingerprint(payload):
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] > self._ttl:
+            del self._entries[key]
+            return None
+        return entry
+
+    def _put(self, key, fingerprint, response):
+        self._entries[key] = (time.monotonic(), fingerprint, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+    async def run_once(self, key, payload, action):
+        """Returns await action() the first time; the stored result for a retry with the same key."""
+        if not key:
+            return await action()
+        fingerprint = self.fingerprint(payload)
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        try:
+            async with lock:
+                entry = self._get(key)
+                if entry:
+                    if entry[1] != fingerprint:
+                        raise HTTPException(status_code=422,
+                                            detail="Idempotency-Key was already used for a different request")
+                    return entry[2]
+                response = await action()
+                self._put(key, fingerprint, response)
+                return response
+        finally:
+            if not lock.locked() and self._locks.get(key) is lock:
+                del self._locks[key]
+
+
+replays = ReplayCache()
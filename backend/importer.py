@@ -0,0 +1,103 @@
+import json
+import re
+
+DEFAULT_POINTS = 10
+# Bump whenever parse_line's rows or errors change: cached parses of uploads are keyed by it
+PARSER_VERSION = 1
+
+
+def parse_options(raw: str):
+    raw = raw.strip()
+    if raw.startswith("[") and raw.endswith("]"):
+        try:
+            return json.loads(raw)
+        except Exception:
+            pass
+    return [o.strip() for o in raw.split(",")]
+
+
+def parse_line(line: str):
+    """
+    Parses one "Question | Answer | Category | Points | Options" line.
+    Returns (row, error); blank and non-question lines give (None, None).
+    """
+    line = line.strip()
+    if not line or "|" not in line:
+        return None, None
+
+    # Remove numbering like "1." or "12."
+    line = re.sub(r'^\d+\.\s*', '', line)
+
+    parts = [p.strip() for p in line.split("|")]
+
+    q_text = parts[0]
+    q_answer = parts[1] if len(parts) > 1 else ""
+    q_category = parts[2] if len(parts) > 2 and parts[2] else None
+
+    if not q_text:
+        return None, "missing question text"
+    if not q_answer:
+        return None, "missing answer"
+
+    q_points = DEFAULT_POINTS
+    if len(parts) > 3 and parts[3]:
+        try:
+            q_points = int(parts[3])
+        except ValueError:
+            return None, f"points must be a whole number, got {parts[3]!r}"
+
+    q_options = None
+    if len(parts) > 4 and parts[4]:
+        q_options = parse_options(parts[4])
+
+    return {
+        "text": q_text,
+        "answer": q_answer,
+        "category": q_category,
+        "points": q_points,
+        "options": q_options,
+    }, None
+
+
+def parse_questions(text: str, first_line: int = 1):
+    """Parses every line of ``text``. Returns (rows, errors) with 1-based line numbers in errors."""
+    rows, errors = [], []
+    for number, line in enumerate(text.splitlines(), start=first_line):
+        row, error = parse_line(line)
+        if error:
+            errors.append({"line": number, "error": error, "content": line.strip()[:200]})
+        elif row:
+            rows.append(row)
+    return rows, errors
+
+
+# =====================
+# Document text extraction
+# (runs in worker processes; parser libraries are imported on first use)
+# =====================
+def read_txt(path: str) -> str:
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def read_docx(path: str) -> str:
+    from docx import Document
+    doc = Document(path)
+    return "\n".join([para.text for para in doc.paragraphs if para.text.strip()])
+
+
+def count_pdf_pages(path: str) -> int:
+    import PyPDF2
+    return len(PyPDF2.PdfReader(path).pages)
+
+
+def read_pdf_pages(path: str, start: int, stop: int) -> str:
+    """Text of pages [start, stop); the reader only loads the pages it is asked for."""
+    import PyPDF2
+    pdf_reader = PyPDF2.PdfReader(path)
+    text = ""
+    for number in range(start, stop):
+        extracted = pdf_reader.pages[number].extract_text()
+        if extracted:
+            text += extracted + "\n"
+    return text
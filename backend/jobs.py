@@ -0,0 +1,210 @@
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import importer
+from database import crud
+from database.db import SessionLocal
+from etags import versions
+
+PDF_PAGES_PER_TASK = 10
+MAX_JOBS_KEPT = 200
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "2"))
+PARSE_CACHE_DIR = os.getenv("PARSE_CACHE_DIR", os.path.join("uploads", ".parsed"))
+PARSE_CACHE_MAX_BYTES = int(os.getenv("PARSE_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+class JobStore:
+    """Thread-safe, bounded record of upload jobs (oldest finished jobs are dropped first)."""
+
+    def __init__(self, max_jobs=MAX_JOBS_KEPT):
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._max_jobs = max_jobs
+
+    def create(self, filename, event_id):
+        job = {
+            "id": uuid.uuid4().hex,
+            "event_id": event_id,
+            "filename": filename,
+            "sha256": None,
+            "cached": False,
+            "status": "queued",
+            "pages_total": None,
+            "pages_parsed": 0,
+            "questions_found": 0,
+            "errors": [],
+            "uploaded": 0,
+            "ids": [],
+            "created_at": time.time(),
+            "finished_at": None,
+        }
+        with self._lock:
+            self._jobs[job["id"]] = job
+            while len(self._jobs) > self._max_jobs:
+                self._jobs.popitem(last=False)
+        return dict(job)
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def fail(self, job_id, error):
+        """Marks the job failed with an error that is not about a particular line."""
+        self.update(job_id, status="failed", errors=[{"line": None, "error": str(error)}], finished_at=time.time())
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+
+jobs = JobStore()
+
+
+class ParsedCache:
+    """
+    Parsed rows of uploaded files on local disk, keyed by the file's SHA-256
+    and importer.PARSER_VERSION, so a parser change never serves old results.
+    Least recently used entries are evicted once the total size passes max_bytes.
+    """
+
+    def __init__(self, directory=PARSE_CACHE_DIR, max_bytes=PARSE_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _path(self, sha256):
+        return os.path.join(self.directory, f"{sha256}.v{importer.PARSER_VERSION}.json")
+
+    def get(self, sha256):
+        path = self._path(sha256)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)  # mark as recently used
+        except (OSError, ValueError):
+            return None
+        return entry["rows"], entry["errors"]
+
+    def put(self, sha256, rows, errors):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(sha256)
+        partial = f"{path}.{threading.get_ident()}.tmp"
+        with open(partial, "w", encoding="utf-8") as f:
+            json.dump({"rows": rows, "errors": errors}, f)
+        os.replace(partial, path)
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith(".json"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                total -= size
+
+
+parse_cache = ParsedCache()
+
+# Parsing runs in worker processes so it never holds the API's GIL;
+# a couple of threads drive the jobs and do the database import.
+_process_pool = None
+_job_threads = ThreadPoolExecutor(max_workers=2, thread_name_prefix="upload-job")
+_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=PARSE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _process_pool
+
+
+def start_import(job_id, event_id, filepath, ext, sha256=None):
+    _job_threads.submit(run_import, job_id, event_id, filepath, ext, sha256)
+
+
+def _extract_chunks(job_id, filepath, ext):
+    """Yields the document text in order, a chunk of pages at a time, updating progress."""
+    pool = get_process_pool()
+    if ext == "txt":
+        jobs.update(job_id, pages_total=1)
+        yield importer.read_txt(filepath)
+        jobs.update(job_id, pages_parsed=1)
+    elif ext == "docx":
+        jobs.update(job_id, pages_total=1)
+        yield pool.submit(importer.read_docx, filepath).result()
+        jobs.update(job_id, pages_parsed=1)
+    elif ext == "pdf":
+        total = pool.submit(importer.count_pdf_pages, filepath).result()
+        jobs.update(job_id, pages_total=total)
+        futures = [
+            (min(start + PDF_PAGES_PER_TASK, total),
+             pool.submit(importer.read_pdf_pages, filepath, start, min(start + PDF_PAGES_PER_TASK, total)))
+            for start in range(0, total, PDF_PAGES_PER_TASK)
+        ]
+        for stop, future in futures:
+            yield future.result()
+            jobs.update(job_id, pages_parsed=stop)
+
+
+def _parse(job_id, filepath, ext):
+    rows, errors, next_line = [], [], 1
+    for text in _extract_chunks(job_id, filepath, ext):
+        chunk_rows, chunk_errors = importer.parse_questions(text, first_line=next_line)
+        next_line += len(text.splitlines())
+        rows.extend(chunk_rows)
+        errors.extend(chunk_errors)
+        jobs.update(job_id, questions_found=len(rows), errors=list(errors))
+    return rows, errors
+
+
+def run_import(job_id, event_id, filepath, ext, sha256=None):
+    try:
+        jobs.update(job_id, status="parsing")
+        cached = parse_cache.get(sha256) if sha256 else None
+        if cached:
+            # identical file seen before: skip parsing entirely
+            rows, errors = cached
+            jobs.update(job_id, cached=True, questions_found=len(rows), errors=errors)
+        else:
+            rows, errors = _parse(job_id, filepath, ext)
+            if sha256:
+                parse_cache.put(sha256, rows, errors)
+
+        if errors:
+            # all-or-nothing: report every bad line, insert nothing
+            jobs.update(job_id, status="failed", finished_at=time.time())
+            return
+
+        jobs.update(job_id, status="importing")
+        db = SessionLocal()
+        try:
+            ids = crud.bulk_create_questions(db, event_id, rows)
+        finally:
+            db.close()
+        versions.bump(event_id, "questions")
+        jobs.update(job_id, status="done", uploaded=len(ids), ids=ids, finished_at=time.time())
+    except Exception as e:
+        jobs.update(job_id, status="failed", errors=[{"line": None, "error": str(e)}], finished_at=time.time())
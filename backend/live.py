@@ -0,0 +1,103 @@
+import asyncio
+
+from responses import dumps
+
+HEARTBEAT_SECONDS = 15
+COALESCE_SECONDS = 0.25
+
+
+def sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {dumps(data).decode()}\n\n"
+
+
+def scoreboard_delta(old: dict, new: dict):
+    """Only the parts of a full scoreboard that changed between two snapshots."""
+    delta = {}
+    if old["overall"] != new["overall"]:
+        delta["overall"] = new["overall"]
+
+    old_categories = {c["name"]: c for c in old["categories"]}
+    changed = [c for c in new["categories"] if old_categories.get(c["name"]) != c]
+    if changed:
+        delta["categories"] = changed
+
+    new_names = {c["name"] for c in new["categories"]}
+    removed = [name for name in old_categories if name not in new_names]
+    if removed:
+        delta["removed"] = removed
+    return delta
+
+
+class ScoreboardBroadcaster:
+    """
+    Fans scoreboard changes out to Server-Sent Events subscribers.
+
+    publish() is cheap and thread-safe: it only bumps a version and wakes
+    waiting streams. Each stream then waits a short coalescing window and
+    sends the latest state, so bursts of scores become one message and a
+    slow client skips intermediate states instead of queueing them. The
+    snapshot itself is built once per version and shared by all streams.
+    """
+
+    def __init__(self, snapshot, heartbeat_seconds=HEARTBEAT_SECONDS, coalesce_seconds=COALESCE_SECONDS):
+        self._snapshot = snapshot
+        self._heartbeat = heartbeat_seconds
+        self._coalesce = coalesce_seconds
+        self._loop = None
+        self._version = 0
+        self._changed = None
+        self._cached = (-1, None)
+        self._building = None
+
+    def publish(self):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return  # nobody has subscribed yet
+        loop.call_soon_threadsafe(self._bump)
+
+    def _bump(self):
+        self._version += 1
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def _current(self):
+        while self._cached[0] != self._version:
+            if self._building is None:
+                self._building = asyncio.ensure_future(self._build(self._version))
+            await asyncio.shield(self._building)
+        return self._cached[1]
+
+    async def _build(self, version):
+        try:
+            data = await self._snapshot()
+            self._cached = (version, data)
+            return data
+        finally:
+            self._building = None
+
+    async def stream(self, request):
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._changed = asyncio.Event()
+        yield "retry: 3000\n\n"
+        changed = self._changed
+        last = await self._current()
+        yield sse("snapshot", last)
+        while True:
+            try:
+                await asyncio.wait_for(changed.wait(), self._heartbeat)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": ping\n\n"
+                continue
+
+            await asyncio.sleep(self._coalesce)
+            if await request.is_disconnected():
+                break
+            changed = self._changed
+            data = await self._current()
+            delta = scoreboard_delta(last, data)
+            if delta:
+                yield sse("delta", delta)
+            last = data
@@ -0,0 +1,219 @@
+import contextvars
+import logging
+import os
+import sys
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+from sqlalchemy import event
+
+try:
+    import greenlet
+except ImportError:  # async routes then stay untagged
+    greenlet = None
+
+logger = logging.getLogger(__name__)
+
+# Log any request that issues more than this many queries (0 = off)
+METRICS_QUERY_LOG_THRESHOLD = int(os.getenv("METRICS_QUERY_LOG_THRESHOLD", "0"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_TIME_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Prometheus-style family of cumulative histograms, one per label set."""
+
+    def __init__(self, name, help, labels, buckets):
+        self.name, self.help, self.labels, self.buckets = name, help, labels, buckets
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, values, amount):
+        series = self._series.get(values)
+        if series is None:
+            series = self._series[values] = [0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, amount)] += 1
+        series[-2] += amount
+        series[-1] += 1
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for values, series in sorted(self._series.items()):
+            labels = _labels(self.labels, values)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                yield f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}'
+            yield f"{self.name}_sum{{{labels}}} {series[-2]}"
+            yield f"{self.name}_count{{{labels}}} {series[-1]}"
+
+
+class CounterFamily:
+    def __init__(self, name, help, labels, type="counter"):
+        self.name, self.help, self.labels, self.type = name, help, labels, type
+        self._series = Counter()
+
+    def inc(self, values, amount=1):
+        self._series[values] += amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        for values, value in sorted(self._series.items()):
+            yield f"{self.name}{{{_labels(self.labels, values)}}} {value}"
+
+
+def _labels(names, values):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{name}="{escape(value)}"' for name, value in zip(names, values))
+
+
+class RequestStats:
+    __slots__ = ("queries", "seconds", "functions")
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+        self.functions = Counter()
+
+
+# The request being served; sync routes see it through the threadpool's copied context
+_current = contextvars.ContextVar("metrics_request", default=None)
+
+
+class Metrics:
+    """
+    Request and SQL instrumentation for /metrics.
+
+    The middleware times every HTTP request and tracks in-flight counts and
+    response sizes per route template. Cursor hooks on the engines count
+    and time every query, tagged with the outermost ``crud`` / ``async_crud``
+    function on the call stack and added to the current request's totals,
+    so per-request query counts expose N+1 loops.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._crud_files = set()
+        self.requests = CounterFamily("quiz_http_requests_total", "HTTP requests served.",
+                                      ("method", "route", "status"))
+        self.in_flight = CounterFamily("quiz_http_requests_in_flight", "HTTP requests being served.",
+                                       ("method",), type="gauge")
+        self.latency = Histogram("quiz_http_request_duration_seconds", "Time to the last response byte.",
+                                 ("method", "route"), LATENCY_BUCKETS)
+        self.size = Histogram("quiz_http_response_size_bytes", "Response body size.",
+                              ("method", "route"), SIZE_BUCKETS)
+        self.request_queries = Histogram("quiz_http_request_db_queries", "Database queries issued per request.",
+                                         ("method", "route"), QUERY_COUNT_BUCKETS)
+        self.queries = Histogram("quiz_db_query_duration_seconds", "Database query time by crud function.",
+                                 ("function",), QUERY_TIME_BUCKETS)
+
+    # ---------------------
+    # SQL hooks
+    # ---------------------
+    def instrument(self, engine, *modules):
+        """Count and time every query on ``engine``; ``modules`` are the crud modules used as tags."""
+        self._crud_files.update(m.__file__ for m in modules)
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["metrics_query_start"].pop()
+        function = self._crud_function()
+        with self._lock:
+            self.queries.observe((function,), elapsed)
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.seconds += elapsed
+            stats.functions[function] += 1
+
+    def _crud_function(self):
+        """Outermost crud function on the stack; async queries continue into the awaiting greenlet."""
+        found = None
+        frame = sys._getframe(2)
+        current = greenlet.getcurrent() if greenlet else None
+        while frame is not None:
+            while frame is not None:
+                code = frame.f_code
+                if code.co_filename in self._crud_files:
+                    found = f"{os.path.splitext(os.path.basename(code.co_filename))[0]}.{code.co_name}"
+                frame = frame.f_back
+            current = current.parent if current is not None else None
+            frame = current.gr_frame if current is not None else None
+        return found or "other"
+
+    # ---------------------
+    # Requests
+    # ---------------------
+    def record_request(self, method, route, status, elapsed, size, stats, streamed):
+        with self._lock:
+            self.requests.inc((method, route, status))
+            self.request_queries.observe((method, route), stats.queries)
+            if not streamed:  # long-lived streams would swamp the latency and size histograms
+                self.latency.observe((method, route), elapsed)
+                self.size.observe((method, route), size)
+        if METRICS_QUERY_LOG_THRESHOLD and stats.queries > METRICS_QUERY_LOG_THRESHOLD:
+            top = ", ".join(f"{name} x{count}" for name, count in stats.functions.most_common(3))
+            logger.warning("%s %s issued %d queries (%.1f ms in the database): %s",
+                           method, route, stats.queries, stats.seconds * 1000, top)
+
+    def set_in_flight(self, method, delta):
+        with self._lock:
+            self.in_flight.inc((method,), delta)
+
+    def render(self):
+        with self._lock:
+            families = (self.requests, self.in_flight, self.latency, self.size,
+                        self.request_queries, self.queries)
+            return "\n".join(line for family in families for line in family.render()) + "\n"
+
+
+metrics = Metrics()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no body buffering, so streaming responses pass straight through)."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        response = {"status": 500, "size": 0, "streamed": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for name, value in message.get("headers", ()):
+                    if name.lower() == b"content-type" and value.startswith(b"text/event-stream"):
+                        response["streamed"] = True
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        metrics.set_in_flight(method, 1)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.set_in_flight(method, -1)
+            _current.reset(token)
+            # FastAPI leaves the matched route in the scope; unmatched paths share one label
+            route = getattr(scope.get("route"), "path", None) or "<unmatched>"
+            metrics.record_request(method, route, str(response["status"]), time.perf_counter() - start,
+                                   response["size"], stats, response["streamed"])
@@ -0,0 +1,60 @@
+import csv
+import datetime
+import io
+import json
+
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # standard library encoder instead
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime.date, datetime.datetime, datetime.time)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def dumps(data) -> bytes:
+    """Compact UTF-8 JSON, through orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=_default).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def fast_json(content, response: Response = None, status_code: int = 200):
+    """
+    Responds with already-shaped rows (dicts, lists, plain values) as is.
+
+    Returning a Response skips FastAPI's response_model validation and
+    jsonable_encoder walk over every row. Headers that dependencies set on
+    the injected ``response`` (ETag, X-Next-Cursor) are carried over.
+    """
+    out = FastJSONResponse(content, status_code=status_code)
+    if response is not None:
+        out.headers.raw.extend((k, v) for k, v in response.headers.raw if k != b"content-length")
+    return out
+
+
+def ndjson_lines(rows) -> bytes:
+    """One compact JSON object per line."""
+    return b"".join(dumps(row) + b"\n" for row in rows)
+
+
+def csv_lines(rows, fields) -> bytes:
+    """CSV rows holding ``fields`` in order (a header when ``rows`` is None)."""
+    out = io.StringIO()
+    writer = csv.writer(out)
+    if rows is None:
+        writer.writerow(fields)
+    else:
+        writer.writerows([row[f] for f in fields] for row in rows)
+    return out.getvalue().encode("utf-8")
@@ -0,0 +1,48 @@
+import threading
+from collections import OrderedDict, namedtuple
+
+from database import crud
+
+# Ordered question ids of a category, their positions, and each question as a ready-to-send dict
+CategoryRound = namedtuple("CategoryRound", ["question_ids", "positions", "questions"])
+
+
+class RoundCache:
+    """
+    Precomputed rounds keyed by (event_id, category_id, questions version).
+
+    A bump of the questions version makes every old key unreachable, so
+    entries never need explicit invalidation; the oldest are simply evicted.
+    """
+
+    def __init__(self, max_entries=32):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._max_entries = max_entries
+
+    def get(self, db, event_id, category_id, version):
+        """The category's round, or None if the category does not exist in the event."""
+        key = (event_id, category_id, version)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+
+        round_ = None
+        if crud.get_category(db, event_id, category_id):
+            rows, _ = crud.get_question_page(db, event_id, category_id=category_id)
+            question_ids = tuple(r["id"] for r in rows)
+            round_ = CategoryRound(
+                question_ids=question_ids,
+                positions={qid: i for i, qid in enumerate(question_ids)},
+                questions={r["id"]: r for r in rows},
+            )
+
+        with self._lock:
+            self._entries[key] = round_
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+        return round_
+
+
+round_cache = RoundCache()
@@ -0,0 +1,137 @@
+"""
+Cold-start profile for the API.
+
+In fresh interpreters (nothing cached in-process), reports:
+
+  * import and module initialization time of everything app.py pulls in
+    (python -X importtime), grouped by direct import and by our own modules
+  * time to import the app, then to answer the first requests a quiz screen makes
+
+Uses the same DATABASE_URL / .env as the app; AUTO_MIGRATE is honoured.
+
+    python startup_profile.py
+    python startup_profile.py --json
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+FIRST_REQUESTS = ("/scoreboard", "/teams", "/categories")
+
+_FIRST_RESPONSE_SCRIPT = """
+import asyncio, json, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+
+async def first_requests():
+    import httpx
+    timings = []
+    transport = httpx.ASGITransport(app=app.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://startup") as client:
+        for path in %r:
+            t = time.perf_counter()
+            response = await client.get(path)
+            timings.append({"path": path, "status": response.status_code, "ms": (time.perf_counter() - t) * 1000})
+    return timings
+
+requests = asyncio.run(first_requests())
+print(json.dumps({"import_ms": (imported - started) * 1000, "requests": requests,
+                  "first_response_ms": (time.perf_counter() - started) * 1000}))
+"""
+
+
+def local_modules():
+    return {os.path.splitext(name)[0] for name in os.listdir(BACKEND_DIR)
+            if name.endswith(".py") or os.path.isfile(os.path.join(BACKEND_DIR, name, "__init__.py"))}
+
+
+def import_times():
+    """(name, depth, self_ms, cumulative_ms) for every module imported by ``import app``."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                            cwd=BACKEND_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(result.stderr[-2000:])
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), depth, int(self_us) / 1000, int(cumulative_us) / 1000))
+    return modules
+
+
+def first_response():
+    result = subprocess.run([sys.executable, "-c", _FIRST_RESPONSE_SCRIPT % (FIRST_REQUESTS,)],
+                            cwd=BACKEND_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise SystemExit(result.stderr[-2000:])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def profile(top):
+    modules = import_times()
+    ours = local_modules()
+    # importtime lists a module after everything it imported, one indent level deeper
+    app_index = next(i for i, m in enumerate(modules) if m[0] == "app")
+    app_depth = modules[app_index][1]
+    direct = []
+    for m in reversed(modules[:app_index]):
+        if m[1] <= app_depth:
+            break
+        if m[1] == app_depth + 1:
+            direct.append(m)
+    return {
+        "import_app_ms": next(round(cum, 1) for name, _, _, cum in modules if name == "app"),
+        "direct_imports": [
+            {"module": name, "cumulative_ms": round(cum, 1)}
+            for name, _, _, cum in sorted(direct, key=lambda m: -m[3])[:top]
+        ],
+        "app_modules": [
+            {"module": name, "self_ms": round(self_ms, 1), "cumulative_ms": round(cum, 1)}
+            for name, _, self_ms, cum in modules if name.split(".")[0] in ours
+        ],
+        "slowest_modules_self": [
+            {"module": name, "self_ms": round(self_ms, 1)}
+            for name, _, self_ms, _ in sorted(modules, key=lambda m: -m[2])[:top]
+        ],
+        "startup": first_response(),
+    }
+
+
+def print_report(report):
+    print(f"import app: {report['import_app_ms']:.1f} ms (python -X importtime)\n")
+    print("Direct imports of app.py (cumulative):")
+    for m in report["direct_imports"]:
+        print(f"  {m['cumulative_ms']:8.1f} ms  {m['module']}")
+    print("\nApp modules (self / cumulative, including module-level initialization):")
+    for m in report["app_modules"]:
+        print(f"  {m['self_ms']:8.1f} / {m['cumulative_ms']:8.1f} ms  {m['module']}")
+    print("\nSlowest modules by own time:")
+    for m in report["slowest_modules_self"]:
+        print(f"  {m['self_ms']:8.1f} ms  {m['module']}")
+    startup = report["startup"]
+    print(f"\nFresh process: import {startup['import_ms']:.1f} ms, "
+          f"first responses done after {startup['first_response_ms']:.1f} ms")
+    for r in startup["requests"]:
+        print(f"  {r['ms']:8.1f} ms  GET {r['path']} -> {r['status']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start import and first-response profile")
+    parser.add_argument("--top", type=int, default=12, help="rows per ranking")
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    args = parser.parse_args(argv)
+    report = profile(args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""
+Tests run against a throwaway SQLite database, as benchmark.py does.
+
+    cd backend && python -m unittest discover -s tests -t .
+"""
+import os
+import sys
+import tempfile
+
+# Must be set before anything imports database.db
+_workdir = tempfile.mkdtemp(prefix="quiz-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'test.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import migrate  # noqa: E402
+
+migrate.upgrade()
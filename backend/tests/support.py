@@ -0,0 +1,45 @@
+import itertools
+
+from database import crud
+from database.db import SessionLocal
+
+_names = itertools.count(1)
+
+
+def new_event(db, teams=2, questions=(("Genesis", 2), ("Gospels", 2))):
+    """A fresh event with ``teams`` teams and (category, count) questions; returns (event_id, team_ids, question_ids)."""
+    event_id = crud.create_event(db, f"Test event {next(_names)}").id
+    team_ids = [crud.create_team(db, event_id, f"Team {i + 1}", "#000000").id for i in range(teams)]
+    question_ids = [
+        crud.create_question(db, event_id, f"{category} question {i + 1}?", "answer", category).id
+        for category, count in questions for i in range(count)
+    ]
+    return event_id, team_ids, question_ids
+
+
+def sql_scoreboard(event_id):
+    """(totals per team, points per (team, category)) straight from the scores table."""
+    db = SessionLocal()
+    try:
+        names = {c.id: c.name for c in crud.get_categories(db, event_id)}
+        totals, categories = {}, {}
+        for row in crud.get_team_category_totals(db, event_id):
+            totals[row.team_id] = totals.get(row.team_id, 0) + row.points
+            if row.category_id is not None and row.points:
+                categories[(row.team_id, names[row.category_id])] = row.points
+        return totals, categories
+    finally:
+        db.close()
+
+
+def board_scoreboard(event_id):
+    """The same two views from the event's in-memory board, loading it if needed."""
+    db = SessionLocal()
+    try:
+        full = crud.get_live_scoreboard(db, event_id).full()
+    finally:
+        db.close()
+    totals = {row["team_id"]: row["total_points"] for row in full["overall"]}
+    categories = {(row["team_id"], category["name"]): row["points"]
+                  for category in full["categories"] for row in category["scores"] if row["points"]}
+    return totals, categories
@@ -0,0 +1,128 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from sqlalchemy import func
+
+from database import async_crud, crud
+from database.db import AsyncSessionLocal, SessionLocal
+from database.models import Score
+from tests.support import new_event, sql_scoreboard, board_scoreboard
+
+
+class AwardRetryTest(unittest.TestCase):
+    """Awards that lose a race with a concurrent award are redone on top of it."""
+
+    def setUp(self):
+        self.db = SessionLocal()
+        self.event_id, self.teams, self.questions = new_event(self.db)
+        crud.get_live_scoreboard(self.db, self.event_id)
+
+    def tearDown(self):
+        self.db.close()
+
+    def concurrent_award(self, points):
+        other = SessionLocal()
+        try:
+            crud.award_points(other, self.event_id, self.teams[0], self.questions[0], points)
+        finally:
+            other.close()
+
+    def attempts(self):
+        """Patches crud._upsert_scores to record what each call did: "ok" or the exception it raised."""
+        upsert, outcomes = crud._upsert_scores, []
+
+        def recording(*args):
+            try:
+                deltas = upsert(*args)
+            except Exception as e:
+                outcomes.append(type(e).__name__)
+                raise
+            outcomes.append("ok")
+            return deltas
+
+        return mock.patch.object(crud, "_upsert_scores", recording), outcomes
+
+    def stored(self):
+        return self.db.query(Score.points_awarded).filter(Score.event_id == self.event_id).all()
+
+    def test_reaward_retried_after_a_concurrent_reaward(self):
+        crud.award_points(self.db, self.event_id, self.teams[0], self.questions[0], 10)
+        rescore, raced = crud.rescore, []
+
+        def reaward_first(changes):
+            if not raced:
+                raced.append(True)
+                self.concurrent_award(30)  # lands between our read of 10 and our update
+            return rescore(changes)
+
+        recording, outcomes = self.attempts()
+        with mock.patch.object(crud, "rescore", reaward_first), recording:
+            score = crud.award_points(self.db, self.event_id, self.teams[0], self.questions[0], 20)
+        # ours went stale, the concurrent one (nested inside it) went through, then ours against 30
+        self.assertEqual(outcomes, ["ok", "StaleScore", "ok"])
+        self.assertEqual(score.points_awarded, 20)
+        self.assertEqual(self.stored(), [(20,)])
+        self.assertEqual(board_scoreboard(self.event_id), sql_scoreboard(self.event_id))
+        self.assertEqual(board_scoreboard(self.event_id)[0][self.teams[0]], 20)
+
+    def test_insert_retried_after_a_concurrent_insert(self):
+        insert, raced = crud.insert, []
+
+        def insert_first(table):
+            if not raced:
+                raced.append(True)
+                self.concurrent_award(30)  # takes the (team, question) pair first
+            return insert(table)
+
+        recording, outcomes = self.attempts()
+        with mock.patch.object(crud, "insert", insert_first), recording:
+            score = crud.award_points(self.db, self.event_id, self.teams[0], self.questions[0], 20)
+        # the concurrent insert went through, ours hit the unique pair, then re-awarded the stored 30
+        self.assertEqual(outcomes, ["ok", "IntegrityError", "ok"])
+        self.assertEqual(score.points_awarded, 20)
+        self.assertEqual(self.stored(), [(20,)])
+        self.assertEqual(board_scoreboard(self.event_id), sql_scoreboard(self.event_id))
+        self.assertEqual(board_scoreboard(self.event_id)[0][self.teams[0]], 20)
+
+    def test_gives_up_after_award_attempts(self):
+        with mock.patch.object(crud, "_upsert_scores", side_effect=crud.StaleScore) as upsert:
+            with self.assertRaises(crud.StaleScore):
+                crud.award_points(self.db, self.event_id, self.teams[0], self.questions[0], 20)
+        self.assertEqual(upsert.call_count, crud.AWARD_ATTEMPTS)
+        self.assertEqual(self.stored(), [])
+        self.assertEqual(board_scoreboard(self.event_id), sql_scoreboard(self.event_id))
+
+
+class ConcurrentAsyncAwardTest(unittest.TestCase):
+    """Concurrent async re-awards of the same pairs leave the board equal to SQL."""
+
+    def test_concurrent_reawards(self):
+        db = SessionLocal()
+        try:
+            event_id, teams, questions = new_event(db)
+            crud.get_live_scoreboard(db, event_id)
+        finally:
+            db.close()
+
+        async def award(question_id, points):
+            async with AsyncSessionLocal() as session:
+                return await async_crud.award_points(session, event_id, teams[0], question_id, points)
+
+        async def rounds():
+            await award(questions[0], 10)
+            for points in (20, 35, 5, 50):
+                await asyncio.gather(*(award(questions[0], points) for _ in range(4)),
+                                     award(questions[1], points + 1), award(questions[1], points))
+                self.assertEqual(board_scoreboard(event_id), sql_scoreboard(event_id))
+
+        asyncio.run(rounds())
+        db = SessionLocal()
+        try:
+            self.assertEqual(db.query(func.count(Score.id)).filter(Score.event_id == event_id).scalar(), 2)
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
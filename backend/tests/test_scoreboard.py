@@ -0,0 +1,128 @@
+import unittest
+from unittest import mock
+
+from database import crud
+from database.db import SessionLocal
+from database.scoreboard import boards
+from tests.support import new_event, sql_scoreboard, board_scoreboard
+
+
+class BoardMatchesSqlTest(unittest.TestCase):
+    """After every kind of change the in-memory board equals the SQL aggregate."""
+
+    def setUp(self):
+        self.db = SessionLocal()
+        self.event_id, self.teams, self.questions = new_event(self.db)
+        crud.get_live_scoreboard(self.db, self.event_id)  # changes below update a loaded board
+
+    def tearDown(self):
+        self.db.close()
+
+    def assertBoardMatchesSql(self):
+        self.assertEqual(board_scoreboard(self.event_id), sql_scoreboard(self.event_id))
+
+    def test_award(self):
+        crud.award_points(self.db, self.event_id, self.teams[0], self.questions[0], 10)
+        crud.award_points(self.db, self.event_id, self.teams[1], self.questions[2], 7)
+        self.assertBoardMatchesSql()
+        self.assertEqual(board_scoreboard(self.event_id)[0], {self.teams[0]: 10, self.teams[1]: 7})
+
+    def test_reaward_replaces_points(self):
+        crud.award_points(self.db, self.event_id, self.teams[0], self.questions[0], 10)
+        crud.award_points(self.db, self.event_id, self.teams[0], self.questions[0], 4)
+        crud.award_points(self.db, self.event_id, self.teams[0], self.questions[0], 4)
+        self.assertBoardMatchesSql()
+        self.assertEqual(board_scoreboard(self.event_id)[0][self.teams[0]], 4)
+
+    def test_batch_repeated_pair_last_wins(self):
+        team, question = self.teams[0], self.questions[1]
+        crud.award_points_batch(self.db, self.event_id, [(team, question, 3), (self.teams[1], question, 5),
+                                                         (team, question, 8)])
+        self.assertBoardMatchesSql()
+        self.assertEqual(board_scoreboard(self.event_id)[0], {team: 8, self.teams[1]: 5})
+
+    def test_batch_with_unknown_question_stores_nothing(self):
+        self.assertIsNone(crud.award_points_batch(self.db, self.event_id, [(self.teams[0], self.questions[0], 3),
+                                                                           (self.teams[0], 10 ** 9, 3)]))
+        self.assertBoardMatchesSql()
+        self.assertEqual(sql_scoreboard(self.event_id)[0], {self.teams[0]: 0, self.teams[1]: 0})
+
+    def test_delete_team(self):
+        crud.award_points(self.db, self.event_id, self.teams[0], self.questions[0], 10)
+        crud.award_points(self.db, self.event_id, self.teams[1], self.questions[0], 6)
+        crud.delete_team(self.db, self.event_id, self.teams[0])
+        self.assertBoardMatchesSql()
+        self.assertEqual(board_scoreboard(self.event_id)[0], {self.teams[1]: 6})
+
+    def test_clear_questions(self):
+        crud.award_points(self.db, self.event_id, self.teams[0], self.questions[0], 10)
+        crud.clear_questions(self.db, self.event_id)
+        self.assertBoardMatchesSql()
+        self.assertEqual(board_scoreboard(self.event_id), ({self.teams[0]: 0, self.teams[1]: 0}, {}))
+
+    def test_other_events_untouched(self):
+        other = SessionLocal()
+        try:
+            other_event, other_teams, other_questions = new_event(other)
+            crud.award_points(other, other_event, other_teams[0], other_questions[0], 9)
+        finally:
+            other.close()
+        crud.award_points(self.db, self.event_id, self.teams[0], self.questions[0], 10)
+        crud.clear_questions(self.db, self.event_id)
+        self.assertEqual(board_scoreboard(other_event)[0][other_teams[0]], 9)
+        self.assertEqual(board_scoreboard(other_event), sql_scoreboard(other_event))
+
+
+class ReloadRaceTest(unittest.TestCase):
+    """A reload racing an award never loses or double-counts its points."""
+
+    def setUp(self):
+        self.db = SessionLocal()
+        self.event_id, self.teams, self.questions = new_event(self.db)
+        crud.get_live_scoreboard(self.db, self.event_id)
+
+    def tearDown(self):
+        self.db.close()
+
+    def reload(self):
+        db = SessionLocal()
+        try:
+            crud.load_scoreboard(db, self.event_id)
+        finally:
+            db.close()
+
+    def test_reload_between_commit_and_board_update(self):
+        upsert = crud._upsert_scores
+
+        def commit_then_reload(*args):
+            deltas = upsert(*args)
+            self.reload()  # the reload already sees the committed points
+            return deltas
+
+        with mock.patch.object(crud, "_upsert_scores", commit_then_reload):
+            crud.award_points(self.db, self.event_id, self.teams[0], self.questions[0], 10)
+        self.assertEqual(board_scoreboard(self.event_id), sql_scoreboard(self.event_id))
+        self.assertEqual(board_scoreboard(self.event_id)[0][self.teams[0]], 10)
+
+    def test_reload_reading_before_an_award_is_dropped(self):
+        totals = crud.get_team_category_totals
+
+        def award_after_read(db, event_id):
+            rows = totals(db, event_id)  # the aggregate misses the award below
+            other = SessionLocal()
+            try:
+                crud.award_points(other, event_id, self.teams[1], self.questions[2], 5)
+            finally:
+                other.close()
+            return rows
+
+        board = boards.get(self.event_id)
+        with mock.patch.object(crud, "get_team_category_totals", award_after_read):
+            crud.load_scoreboard(self.db, self.event_id)
+        self.assertTrue(board.is_loaded())
+        self.assertEqual(board_scoreboard(self.event_id), sql_scoreboard(self.event_id))
+        self.assertEqual(board_scoreboard(self.event_id)[0][self.teams[1]], 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+from database import crud
+from database.db import SessionLocal
+from database.models import Score
+from tests.support import new_event
+
+
+class TimelineTest(unittest.TestCase):
+    """The Python fallback for other dialects gives the same buckets as the SQL query."""
+
+    def setUp(self):
+        self.db = SessionLocal()
+        self.event_id, self.teams, self.questions = new_event(self.db, teams=3)
+        start = datetime(2025, 3, 1, 22, 58, 30)  # crosses minute, hour and day boundaries
+        self.db.add_all(
+            Score(event_id=self.event_id, team_id=team, question_id=question,
+                  points_awarded=(team + question) % 7, created_at=start + timedelta(seconds=97 * i + 3600 * j))
+            for j, team in enumerate(self.teams) for i, question in enumerate(self.questions)
+        )
+        self.db.commit()
+
+    def tearDown(self):
+        self.db.close()
+
+    def test_fallback_matches_sql(self):
+        for bucket in crud.TIMELINE_BUCKETS:
+            with self.subTest(bucket=bucket):
+                sql_rows = list(crud._timeline_rows(self.db, self.event_id, crud._time_bucket(self.db, bucket)))
+                fallback_rows = [(team, time.isoformat(), points, total) for team, time, points, total
+                                 in crud._timeline_rows_fallback(self.db, self.event_id, bucket)]
+                self.assertTrue(sql_rows)
+                self.assertEqual([tuple(row) for row in sql_rows], fallback_rows)
+
+    def test_running_totals(self):
+        timeline = crud.get_score_timeline(self.db, self.event_id, "day")
+        stored = {team: sum((team + question) % 7 for question in self.questions) for team in self.teams}
+        for series in timeline["series"]:
+            self.assertEqual(series["points"][-1]["total"], stored[series["team_id"]])
+
+    def test_other_dialects_use_the_fallback(self):
+        with mock.patch.object(crud, "_time_bucket", return_value=None), \
+                mock.patch.object(crud, "_timeline_rows") as sql_rows:
+            timeline = crud.get_score_timeline(self.db, self.event_id, "minute")
+        sql_rows.assert_not_called()
+        self.assertEqual([len(s["points"]) for s in timeline["series"]],
+                         [len(s["points"]) for s in crud.get_score_timeline(self.db, self.event_id, "minute")["series"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
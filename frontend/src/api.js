@@ -61,6 +61,25 @@ export async function fetchQuestionsByCategory(categoryId) {
   return res.json();
 }
 
+// ranked full-text search; nextOffset is null on the last page
+export async function searchQuestions(query, { category, offset = 0, limit = 20 } = {}) {
+  const params = new URLSearchParams({ q: query, offset, limit });
+  if (category) params.set("category", category);
+  const res = await fetch(`${API_BASE}/questions/search?${params}`);
+  if (!res.ok) throw new Error("Failed to search questions");
+  const next = res.headers.get("X-Next-Cursor");
+  return { results: await res.json(), nextOffset: next === null ? null : Number(next) };
+}
+
+// team + ordered question ids + current/next question for one quiz turn
+export async function fetchRoundBundle(teamId, categoryId, startQuestionId) {
+  const params = new URLSearchParams({ team_id: teamId, category_id: categoryId });
+  if (startQuestionId) params.set("start_question_id", startQuestionId);
+  const res = await fetch(`${API_BASE}/rounds/bundle?${params}`);
+  if (!res.ok) throw new Error("Failed to fetch quiz round");
+  return res.json();
+}
+
 export async function createQuestion(question) {
   const res = await fetch(`${API_BASE}/questions`, {
     method: "POST",
@@ -74,7 +93,23 @@ export async function createQuestion(question) {
 // --------------------
 // UPLOAD QUESTIONS
 // --------------------
-export async function uploadQuestions(file) {
+function uploadError(detail) {
+  if (detail.errors) {
+    // per-line problems: nothing was imported
+    const lines = detail.errors.slice(0, 5).map((e) => (e.line ? `line ${e.line}: ${e.error}` : e.error));
+    return new Error(`${detail.message} (${detail.errors.length}) - ${lines.join("; ")}`);
+  }
+  return new Error(detail);
+}
+
+export async function fetchJob(jobId) {
+  const res = await fetch(`${API_BASE}/jobs/${jobId}`);
+  if (!res.ok) throw new Error("Failed to fetch upload job");
+  return res.json();
+}
+
+// uploads return a job at once; parsing happens in the background
+export async function uploadQuestions(file, onProgress) {
   const formData = new FormData();
   formData.append("file", file);
 
@@ -85,28 +120,66 @@ export async function uploadQuestions(file) {
 
   if (!res.ok) {
     const err = await res.json().catch(() => ({ detail: "Failed to upload file" }));
-    throw new Error(err.detail || "Failed to upload file");
+    throw uploadError(err.detail || "Failed to upload file");
   }
 
-  return res.json();
+  let job = await res.json();
+  while (job.status !== "done" && job.status !== "failed") {
+    await new Promise((resolve) => setTimeout(resolve, 1000));
+    job = await fetchJob(job.id);
+    onProgress?.(job);
+  }
+
+  if (job.status === "failed") {
+    throw uploadError({ message: "Invalid lines in file", errors: job.errors });
+  }
+  return job; // { uploaded, ids, ... }
 }
 
 // --------------------
 // SCORES
 // --------------------
-export async function awardScore(score) {
-  const res = await fetch(`${API_BASE}/scores`, {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify(score), // score = { team_id, question_id, points }
-  });
-  if (!res.ok) throw new Error("Failed to award score");
-  return res.json();
+const AWARD_ATTEMPTS = 3;
+
+// One key per user action (not per request): retries and double-taps of that
+// action send the same key, so the server replays the first award instead of
+// applying it again.
+export function newIdempotencyKey() {
+  return window.crypto?.randomUUID?.() || `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+}
+
+// retries network errors and 5xx with the same key; 4xx are final
+async function postAward(path, body, key, errorMessage) {
+  for (let attempt = 1; ; attempt++) {
+    let res;
+    try {
+      res = await fetch(`${API_BASE}${path}`, {
+        method: "POST",
+        headers: { "Content-Type": "application/json", "Idempotency-Key": key },
+        body: JSON.stringify(body),
+      });
+    } catch (err) {
+      if (attempt >= AWARD_ATTEMPTS) throw err;
+    }
+    if (res?.ok) return res.json();
+    if ((res && res.status < 500) || attempt >= AWARD_ATTEMPTS) throw new Error(errorMessage);
+    await new Promise((resolve) => setTimeout(resolve, 300 * attempt));
+  }
+}
+
+// score = { team_id, question_id, points }
+export async function awardScore(score, key = newIdempotencyKey()) {
+  return postAward("/scores", score, key, "Failed to award score");
+}
+
+// scores = [{ team_id, question_id, points }, ...]
+export async function awardScores(scores, key = newIdempotencyKey()) {
+  return postAward("/scores/batch", scores, key, "Failed to award scores");
 }
 
 // alias for QuizPage.jsx compatibility
-export async function submitAnswer({ team_id, question_id, points }) {
-  return awardScore({ team_id, question_id, points });
+export async function submitAnswer({ team_id, question_id, points }, key) {
+  return awardScore({ team_id, question_id, points }, key);
 }
 
 // --------------------
@@ -118,6 +191,21 @@ export async function fetchScoreboard() {
   return res.json();
 }
 
+// overall + every category in one request
+export async function fetchFullScoreboard() {
+  const res = await fetch(`${API_BASE}/scoreboard/full`);
+  if (!res.ok) throw new Error("Failed to fetch scoreboard");
+  return res.json(); // { overall: [...], categories: [{ id, name, scores }] }
+}
+
+// live push: onSnapshot(full) on connect, onDelta(changedParts) afterwards
+export function subscribeScoreboard(onSnapshot, onDelta) {
+  const source = new EventSource(`${API_BASE}/scoreboard/stream`);
+  source.addEventListener("snapshot", (e) => onSnapshot(JSON.parse(e.data)));
+  source.addEventListener("delta", (e) => onDelta(JSON.parse(e.data)));
+  return () => source.close();
+}
+
 // ✅ expects category name, not ID
 export async function fetchScoreboardByCategory(categoryName) {
   const res = await fetch(`${API_BASE}/scoreboard/category/${encodeURIComponent(categoryName)}`);
@@ -130,3 +218,15 @@ export async function fetchTeamScores(teamId) {
   if (!res.ok) throw new Error("Failed to fetch team scores");
   return res.json();
 }
+
+// bucket: "minute" | "hour" | "day"; one series of running totals per team
+export async function fetchScoreTimeline(bucket = "minute") {
+  const res = await fetch(`${API_BASE}/scoreboard/timeline?bucket=${bucket}`);
+  if (!res.ok) throw new Error("Failed to fetch score timeline");
+  return res.json();
+}
+
+// a download link: the export is streamed straight to a file
+export function scoreExportUrl(format = "csv") {
+  return `${API_BASE}/scores/export?format=${format}`;
+}
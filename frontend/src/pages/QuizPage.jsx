@@ -1,11 +1,10 @@
-import { useEffect, useState, useRef } from "react";
+import { useEffect, useMemo, useState, useRef } from "react";
 import { useParams, useNavigate } from "react-router-dom";
-import { fetchQuestionsByCategory, submitAnswer, fetchTeams } from "../api";
+import { fetchRoundBundle, newIdempotencyKey, submitAnswer } from "../api";
 
 function QuizPage() {
   const { teamId, categoryId, questionId } = useParams();
-  const [questions, setQuestions] = useState([]);
-  const [currentIndex, setCurrentIndex] = useState(0);
+  const [round, setRound] = useState(null);
   const [timeLeft, setTimeLeft] = useState(0);
   const [readingDone, setReadingDone] = useState(false);
   const [showAnswer, setShowAnswer] = useState(false);
@@ -38,19 +37,14 @@ function QuizPage() {
     window.speechSynthesis.speak(utter);
   };
 
-  // load questions + team
+  // load team + question in one request
   useEffect(() => {
     async function loadData() {
-      const qData = await fetchQuestionsByCategory(categoryId);
-      setQuestions(qData || []);
-      const teams = await fetchTeams();
-      const sel = teams.find(t => t.id === parseInt(teamId));
-      setTeam(sel || null);
+      const bundle = await fetchRoundBundle(teamId, categoryId, questionId);
+      setRound(bundle);
+      setTeam(bundle.team);
 
-      const idx = qData.findIndex(q => q.id === parseInt(questionId));
-      setCurrentIndex(idx >= 0 ? idx : 0);
-
-      if (sel) setTimeLeft(sel.timer_seconds || 30);
+      if (bundle.team) setTimeLeft(bundle.team.timer_seconds || 30);
     }
     loadData();
     // cleanup on unmount
@@ -62,7 +56,7 @@ function QuizPage() {
 
   // Attempt auto-read if session token exists; if it fails we show enable button
   useEffect(() => {
-    if (!questions.length || !team) return;
+    if (!round?.current || !team) return;
 
     const token = sessionStorage.getItem("quiz_user_gesture");
     const ts = Number(sessionStorage.getItem("quiz_gesture_ts") || "0");
@@ -70,7 +64,7 @@ function QuizPage() {
     // token is valid for ~10s to be safe
     const tokenValid = token && (now - ts) < 10000;
 
-    const q = questions[currentIndex];
+    const q = round.current;
     const textToSpeak = `${q.text}. ${q.options ? "Options are: " + q.options.join(", ") : ""}`;
 
     if (tokenValid) {
@@ -103,7 +97,7 @@ function QuizPage() {
       setSpeechBlocked(true);
     }
     // eslint-disable-next-line react-hooks/exhaustive-deps
-  }, [questions, team, currentIndex]);
+  }, [round, team]);
 
   // Timer countdown (runs only when readingDone and timeLeft > 0)
   useEffect(() => {
@@ -125,8 +119,11 @@ function QuizPage() {
     // eslint-disable-next-line react-hooks/exhaustive-deps
   }, [readingDone, timeLeft]);
 
-  if (!questions.length || !team) return <p>Loading...</p>;
-  const q = questions[currentIndex];
+  // one award per question shown: a double-tap or retry reuses the key and is replayed, not re-applied
+  const awardKey = useMemo(() => newIdempotencyKey(), [round?.current?.id, team?.id]);
+
+  if (!round?.current || !team) return <p>Loading...</p>;
+  const q = round.current;
 
   // reveal answer and speak it
   const revealAnswer = () => {
@@ -141,7 +138,7 @@ function QuizPage() {
   // award points then mark globally answered and return
   const awardPoints = async (isCorrect) => {
     if (isCorrect) {
-      await submitAnswer({ team_id: team.id, question_id: q.id, points: q.points });
+      await submitAnswer({ team_id: team.id, question_id: q.id, points: q.points }, awardKey);
     }
     const key = `answered_${categoryId}`;
     const existing = JSON.parse(localStorage.getItem(key) || "[]");
@@ -171,7 +168,7 @@ function QuizPage() {
       {/* LEFT */}
       <div className="flex-1">
         <h1 className="text-3xl font-extrabold mb-6 text-purple-900">
-          Team: {team.name} | Question {currentIndex + 1}/{questions.length}
+          Team: {team.name} | Question {round.index + 1}/{round.question_ids.length}
         </h1>
 
         <p className="mb-6 text-2xl font-bold text-gray-900">{q.text}</p>
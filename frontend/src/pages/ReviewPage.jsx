@@ -1,14 +1,41 @@
 import { useEffect, useState } from "react";
-import { fetchQuestions } from "../api";
+import { fetchQuestions, searchQuestions } from "../api";
 
 function ReviewPage() {
   const [questions, setQuestions] = useState([]);
   const [loading, setLoading] = useState(false);
+  const [query, setQuery] = useState("");
+  const [results, setResults] = useState(null);
+  const [nextOffset, setNextOffset] = useState(null);
 
   useEffect(() => {
     loadQuestions();
   }, []);
 
+  // search as you type, once the typing pauses
+  useEffect(() => {
+    if (!query.trim()) {
+      setResults(null);
+      setNextOffset(null);
+      return;
+    }
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const page = await searchQuestions(query.trim());
+        if (cancelled) return;
+        setResults(page.results);
+        setNextOffset(page.nextOffset);
+      } catch (err) {
+        console.error(err);
+      }
+    }, 250);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [query]);
+
   const loadQuestions = async () => {
     try {
       setLoading(true);
@@ -21,14 +48,34 @@ function ReviewPage() {
     }
   };
 
+  const loadMoreResults = async () => {
+    try {
+      const page = await searchQuestions(query.trim(), { offset: nextOffset });
+      setResults((prev) => [...prev, ...page.results]);
+      setNextOffset(page.nextOffset);
+    } catch (err) {
+      console.error(err);
+    }
+  };
+
   if (loading) return <p className="text-center mt-8 text-lg">Loading...</p>;
   if (questions.length === 0) return <p className="text-center mt-8 text-gray-500">No questions available.</p>;
 
+  const shown = results ?? questions;
+
   return (
     <div className="max-w-5xl mx-auto p-6 sm:p-12 bg-gradient-to-b from-white via-yellow-50 to-purple-50 rounded-3xl shadow-2xl flex flex-col gap-6 font-serif">
       <h2 className="text-3xl font-bold text-purple-800 text-center">Quiz Review</h2>
+      <input
+        type="search"
+        value={query}
+        onChange={(e) => setQuery(e.target.value)}
+        placeholder="Search questions, answers or categories..."
+        className="w-full rounded-2xl border border-purple-200 px-4 py-3 shadow focus:outline-none focus:ring-2 focus:ring-purple-400"
+      />
+      {results && results.length === 0 && <p className="text-center text-gray-500">No matching questions.</p>}
       <ul className="space-y-4">
-        {questions.map((q) => (
+        {shown.map((q) => (
           <li key={q.id} className="bg-white rounded-2xl shadow p-4 sm:p-6 flex flex-col gap-2">
             <p className="text-lg sm:text-xl font-semibold">{q.text}</p>
             <p className="text-gray-700">Answer: <span className="font-bold">{q.answer}</span></p>
@@ -36,6 +83,14 @@ function ReviewPage() {
           </li>
         ))}
       </ul>
+      {results && nextOffset !== null && (
+        <button
+          onClick={loadMoreResults}
+          className="self-center px-6 py-2 rounded-2xl bg-purple-600 text-white font-semibold shadow hover:bg-purple-700"
+        >
+          More results
+        </button>
+      )}
     </div>
   );
 }
@@ -1,5 +1,5 @@
 import { useEffect, useState } from "react";
-import { fetchScoreboard, fetchCategories, fetchScoreboardByCategory } from "../api";
+import { fetchFullScoreboard, subscribeScoreboard } from "../api";
 
 function Scoreboard() {
   const [categories, setCategories] = useState([]);
@@ -14,30 +14,59 @@ function Scoreboard() {
     return `${index + 1}.`;
   };
 
-  async function loadScores() {
-    try {
-      const cats = await fetchCategories();
-      setCategories(cats);
+  function applySnapshot(data) {
+    setCategories(data.categories);
+    setOverall(data.overall);
+
+    const catScores = {};
+    for (const c of data.categories) {
+      catScores[c.name] = c.scores;
+    }
+    setPerCategory(catScores);
+  }
+
+  // delta only carries the sections that changed
+  function applyDelta(delta) {
+    if (delta.overall) setOverall(delta.overall);
 
-      const overallData = await fetchScoreboard();
-      setOverall(overallData.sort((a, b) => b.total_points - a.total_points));
+    if (delta.categories || delta.removed) {
+      const changed = delta.categories || [];
+      const removed = delta.removed || [];
+      setCategories((prev) => {
+        const next = prev
+          .filter((c) => !removed.includes(c.name))
+          .map((c) => changed.find((n) => n.name === c.name) || c);
+        for (const c of changed) {
+          if (!next.some((n) => n.name === c.name)) next.push(c);
+        }
+        return next;
+      });
+      setPerCategory((prev) => {
+        const next = { ...prev };
+        for (const name of removed) delete next[name];
+        for (const c of changed) next[c.name] = c.scores;
+        return next;
+      });
+    }
+  }
 
-      const catScores = {};
-      for (const c of cats) {
-        let scores = await fetchScoreboardByCategory(c.name);
-        scores = scores.sort((a, b) => b.points - a.points);
-        catScores[c.name] = scores;
-      }
-      setPerCategory(catScores);
+  async function loadScores() {
+    try {
+      applySnapshot(await fetchFullScoreboard());
     } catch (err) {
       console.error("Failed to load scores:", err);
     }
   }
 
   useEffect(() => {
+    if (window.EventSource) {
+      // server pushes changes; EventSource reconnects on its own
+      return subscribeScoreboard(applySnapshot, applyDelta);
+    }
+
     loadScores(); // initial load
 
-    // Auto-refresh every 5s
+    // Fallback: auto-refresh every 5s
     const interval = setInterval(() => {
       loadScores();
     }, 5000);